@@ -0,0 +1,116 @@
+"""Benchmark robot/contact listing queries at 100k rows.
+
+Compares the old access pattern (full ORM entities, OFFSET paging, no
+foreign-key index) with keyset pagination over projected columns, with and
+without the owner_id / user_id indexes.
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_listing [--rows 100000] [--users 100]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from .. import models
+from ..routers.robots import ROBOT_LIST_COLUMNS
+from ..routers.emergency import CONTACT_LIST_COLUMNS
+
+PAGE_SIZE = 100
+
+
+def populate(engine, rows, users):
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(models.User.__table__.insert(), [
+            {"id": u, "email": f"user{u}@example.com", "hashed_password": "x", "full_name": f"User {u}", "role": "user"}
+            for u in range(1, users + 1)
+        ])
+        # Interleave owners so each user's rows are spread across the whole table
+        conn.execute(models.Robot.__table__.insert(), [
+            {"serial_number": f"MIRO-{i}", "name": f"Robot {i}", "model_type": "MiRo-e", "is_online": False, "owner_id": i % users + 1}
+            for i in range(rows)
+        ])
+        conn.execute(models.EmergencyContact.__table__.insert(), [
+            {"name": f"Contact {i}", "phone_number": f"+1555{i:07d}", "relation": "family", "user_id": i % users + 1}
+            for i in range(rows)
+        ])
+
+
+def list_offset(db, model, owner_column, owner_id):
+    """Old pattern: full entities, OFFSET/LIMIT, walks every page."""
+    skip, total = 0, 0
+    while True:
+        page = db.query(model).filter(owner_column == owner_id).offset(skip).limit(PAGE_SIZE).all()
+        total += len(page)
+        if len(page) < PAGE_SIZE:
+            return total
+        skip += PAGE_SIZE
+
+
+def list_keyset(db, columns, id_column, owner_column, owner_id):
+    """New pattern: projected columns, keyset cursor on id."""
+    after_id, total = None, 0
+    while True:
+        query = db.query(*columns).filter(owner_column == owner_id)
+        if after_id is not None:
+            query = query.filter(id_column > after_id)
+        page = query.order_by(id_column).limit(PAGE_SIZE + 1).all()
+        total += min(len(page), PAGE_SIZE)
+        if len(page) <= PAGE_SIZE:
+            return total
+        after_id = page[PAGE_SIZE - 1].id
+
+
+def timed(label, fn, db, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        db.expunge_all()
+        start = time.perf_counter()
+        count = fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<32} {best * 1000:9.2f} ms  ({count} rows)")
+
+
+def run(db, owner_id):
+    print(" robots:")
+    timed("offset, full entities", lambda: list_offset(db, models.Robot, models.Robot.owner_id, owner_id), db)
+    timed("keyset, projected columns", lambda: list_keyset(db, ROBOT_LIST_COLUMNS, models.Robot.id, models.Robot.owner_id, owner_id), db)
+    print(" contacts:")
+    timed("unpaged, full entities", lambda: len(db.query(models.EmergencyContact).filter(models.EmergencyContact.user_id == owner_id).all()), db)
+    timed("keyset, projected columns", lambda: list_keyset(db, CONTACT_LIST_COLUMNS, models.EmergencyContact.id, models.EmergencyContact.user_id, owner_id), db)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000, help="Robots and contacts to insert")
+    parser.add_argument("--users", type=int, default=100, help="Owners the rows are spread across")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        print(f"Populating {args.rows} robots and {args.rows} contacts across {args.users} users...")
+        populate(engine, args.rows, args.users)
+        db = sessionmaker(bind=engine)()
+        owner_id = args.users // 2
+
+        print("\nWith foreign-key indexes:")
+        run(db, owner_id)
+
+        db.close()
+        with engine.begin() as conn:
+            conn.execute(text("DROP INDEX ix_robots_owner_id"))
+            conn.execute(text("DROP INDEX ix_emergency_contacts_user_id"))
+        db = sessionmaker(bind=engine)()
+
+        print("\nWithout foreign-key indexes (table scans):")
+        run(db, owner_id)
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark JSON vs binary encoding of robot commands for bridge polling.
+
+Measures server-side serialization, bridge-side parsing and payload size,
+then extrapolates to a fleet polling GET /robots/{id}/command at 10 Hz.
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_wire [--robots 1000] [--iterations 100000]
+"""
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from .. import wire
+from ..routers.robots import RobotCommand
+
+POLL_HZ = 10
+
+
+def per_call_us(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--robots", type=int, default=1000, help="Fleet size for the extrapolation")
+    parser.add_argument("--iterations", type=int, default=100_000, help="Calls per measurement")
+    args = parser.parse_args()
+
+    command = RobotCommand(linear_x=0.5, angular_z=-0.25)
+    frame = wire.encode_command(42, time.time(), command.linear_x, command.angular_z)
+    # What FastAPI does for a response_model return value, roughly
+    json_payload = json.dumps(jsonable_encoder(command), separators=(",", ":")).encode()
+
+    results = {
+        # Per poll: JSON is re-serialized every time, binary is encoded once on send and cached
+        "json": (
+            per_call_us(lambda: json.dumps(jsonable_encoder(command)).encode(), args.iterations),
+            per_call_us(lambda: json.loads(json_payload), args.iterations),
+            len(json_payload),
+        ),
+        "binary": (
+            per_call_us(lambda: wire.encode_command(42, 0.0, command.linear_x, command.angular_z), args.iterations),
+            per_call_us(lambda: wire.decode_command(frame), args.iterations),
+            len(frame),
+        ),
+    }
+
+    polls_per_second = args.robots * POLL_HZ
+    print(f"Fleet: {args.robots} robots polling at {POLL_HZ} Hz = {polls_per_second} polls/s\n")
+    print(f"{'format':<8} {'encode':>10} {'decode':>10} {'payload':>9} {'server CPU':>12} {'bridge CPU':>12} {'body bytes/s':>14}")
+    for name, (encode_us, decode_us, size) in results.items():
+        print(f"{name:<8} {encode_us:8.2f}us {decode_us:8.2f}us {size:7d} B "
+              f"{encode_us * polls_per_second / 1e3:9.1f} ms/s {decode_us * POLL_HZ / 1e3:9.3f} ms/s "
+              f"{size * polls_per_second:14,d}")
+    print("\nserver CPU is per second for the whole fleet; bridge CPU is per second for one robot.")
+    print("Binary responses are pre-encoded in send_command, so the server's per-poll encode cost is a dict lookup.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Import-time breakdown of a module, using `python -X importtime`.
+
+Run from the repository root:
+    python -m backend.benchmarks.profile_startup                       # API (backend.main)
+    python -m backend.benchmarks.profile_startup --module robot_bridge --path simulation
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+
+def profile_imports(module, path=None):
+    """Imports `module` in a fresh interpreter and returns [(self_us, cumulative_us, name)]."""
+    env = dict(os.environ)
+    if path:
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [path, env.get("PYTHONPATH")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env,
+    )
+    if proc.returncode != 0:
+        lines = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError("\n".join(lines))
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="backend.main", help="Module to import")
+    parser.add_argument("--path", default=None, help="Extra directory to put on PYTHONPATH")
+    parser.add_argument("--top", type=int, default=20, help="Number of entries to show")
+    args = parser.parse_args()
+
+    entries = profile_imports(args.module, args.path)
+    total = max(cumulative for _, cumulative, _ in entries)
+    print(f"Importing {args.module}: {total / 1000:.1f} ms total\n")
+
+    print(f"Top {args.top} by cumulative time (top-level packages):")
+    top_level = [e for e in entries if not e[2].startswith("  ")]
+    for self_us, cumulative_us, name in sorted(top_level, key=lambda e: -e[1])[:args.top]:
+        print(f"  {cumulative_us / 1000:9.1f} ms  {name.strip()}")
+
+    print(f"\nTop {args.top} by self time:")
+    for self_us, cumulative_us, name in sorted(entries, key=lambda e: -e[0])[:args.top]:
+        print(f"  {self_us / 1000:9.1f} ms  {name.strip()}")
+
+
+if __name__ == "__main__":
+    main()
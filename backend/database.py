@@ -1,3 +1,4 @@
+import os
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -17,3 +18,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def run_migrations(bind=None):
+    """Brings the schema up to date with `alembic upgrade head`."""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini"))
+    config.attributes["engine"] = bind if bind is not None else engine
+    command.upgrade(config, "head")
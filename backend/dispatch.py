@@ -0,0 +1,232 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, or_
+
+from . import database, models, notifiers
+
+# Number of deliveries sent concurrently
+WORKER_COUNT = 8
+# Deliveries claimed from the queue per pass
+BATCH_SIZE = 64
+# A delivery is marked failed after this many attempts
+MAX_ATTEMPTS = 5
+# Retry backoff: RETRY_BASE_DELAY * 2 ** (attempt - 1) seconds
+RETRY_BASE_DELAY = 2.0
+# Repeated triggers from the same user within this window reuse the alert still being delivered
+DEDUP_WINDOW = timedelta(seconds=60)
+OPEN_ALERT_STATES = ("queued", "dispatching")
+# A claimed delivery still "sending" after this long is claimed again (the pass that
+# claimed it failed before recording a result); must exceed the notifier's send time
+CLAIM_LEASE = timedelta(seconds=60)
+# Fallback polling interval when nothing wakes the worker (retries, restarts)
+POLL_INTERVAL = 1.0
+
+FINAL_DELIVERY_STATES = ("sent", "failed")
+
+
+class EmergencyDispatcher:
+    """Durable emergency fan-out backed by the alert tables in the app database.
+
+    The trigger endpoint only inserts an EmergencyAlert row and wakes the
+    worker. The worker expands queued alerts into one AlertDelivery per
+    emergency contact, sends due deliveries concurrently through the notifier
+    and reschedules failures with exponential backoff. Because all state
+    lives in the database, queued and in-flight work survives a restart.
+    """
+
+    def __init__(self, notifier: Optional[notifiers.Notifier] = None, workers: int = WORKER_COUNT):
+        self.notifier = notifier
+        self.workers = workers
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Triggers run in the threadpool; the dedup check and insert must not interleave
+        self._enqueue_lock = threading.Lock()
+
+    def enqueue(self, db, user_id: int):
+        """Queues an alert for the user. Returns (alert, deduplicated)."""
+        with self._enqueue_lock:
+            alert, deduplicated = self._enqueue(db, user_id)
+        if not deduplicated:
+            self.wake()
+        return alert, deduplicated
+
+    def _enqueue(self, db, user_id: int):
+        cutoff = datetime.utcnow() - DEDUP_WINDOW
+        existing = (
+            db.query(models.EmergencyAlert)
+            .filter(
+                models.EmergencyAlert.user_id == user_id,
+                models.EmergencyAlert.created_at >= cutoff,
+                models.EmergencyAlert.status.in_(OPEN_ALERT_STATES),
+            )
+            .order_by(models.EmergencyAlert.created_at.desc())
+            .first()
+        )
+        if existing:
+            return existing, True
+
+        alert = models.EmergencyAlert(user_id=user_id, status="queued")
+        db.add(alert)
+        db.commit()
+        db.refresh(alert)
+        return alert, False
+
+    def wake(self):
+        """Wakes the worker. Safe to call from request threads."""
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def _expand_queued_alerts(self) -> int:
+        db = database.SessionLocal()
+        try:
+            alerts = db.query(models.EmergencyAlert).filter(models.EmergencyAlert.status == "queued").all()
+            for alert in alerts:
+                contact_ids = db.query(models.EmergencyContact.id).filter(
+                    models.EmergencyContact.user_id == alert.user_id
+                ).all()
+                for (contact_id,) in contact_ids:
+                    db.add(models.AlertDelivery(alert_id=alert.id, contact_id=contact_id))
+                # Nothing to deliver means nothing can fail
+                alert.status = "dispatching" if contact_ids else "completed"
+            db.commit()
+            return len(alerts)
+        finally:
+            db.close()
+
+    def _claim_due(self) -> List[Dict]:
+        now = datetime.utcnow()
+        db = database.SessionLocal()
+        try:
+            deliveries = (
+                db.query(models.AlertDelivery)
+                .filter(or_(
+                    and_(models.AlertDelivery.status == "pending", models.AlertDelivery.next_attempt_at <= now),
+                    and_(models.AlertDelivery.status == "sending", models.AlertDelivery.updated_at < now - CLAIM_LEASE),
+                ))
+                .order_by(models.AlertDelivery.next_attempt_at)
+                .limit(BATCH_SIZE)
+                .all()
+            )
+            jobs = []
+            for delivery in deliveries:
+                delivery.status = "sending"
+                delivery.attempts += 1
+                delivery.updated_at = now
+                contact = delivery.contact
+                user = delivery.alert.user
+                jobs.append({
+                    "delivery_id": delivery.id,
+                    "alert_id": delivery.alert_id,
+                    "attempt": delivery.attempts,
+                    "user_id": user.id,
+                    "user_name": user.full_name,
+                    "user_email": user.email,
+                    "contact_id": contact.id,
+                    "contact_name": contact.name,
+                    "phone_number": contact.phone_number,
+                    "relation": contact.relation,
+                })
+            db.commit()
+            return jobs
+        finally:
+            db.close()
+
+    async def _deliver(self, job: Dict, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            try:
+                await self.notifier.send(job)
+                return job, None
+            except Exception as e:
+                return job, str(e) or e.__class__.__name__
+
+    def _record_results(self, results):
+        now = datetime.utcnow()
+        db = database.SessionLocal()
+        try:
+            alert_ids = set()
+            for job, error in results:
+                delivery = db.get(models.AlertDelivery, job["delivery_id"])
+                alert_ids.add(delivery.alert_id)
+                if error is None:
+                    delivery.status = "sent"
+                    delivery.last_error = None
+                elif delivery.attempts >= MAX_ATTEMPTS:
+                    delivery.status = "failed"
+                    delivery.last_error = error
+                else:
+                    delivery.status = "pending"
+                    delivery.last_error = error
+                    delivery.next_attempt_at = now + timedelta(seconds=RETRY_BASE_DELAY * 2 ** (delivery.attempts - 1))
+            db.flush()
+
+            for alert_id in alert_ids:
+                statuses = [row[0] for row in db.query(models.AlertDelivery.status).filter(
+                    models.AlertDelivery.alert_id == alert_id
+                ).all()]
+                if all(s in FINAL_DELIVERY_STATES for s in statuses):
+                    alert = db.get(models.EmergencyAlert, alert_id)
+                    alert.status = "completed" if all(s == "sent" for s in statuses) else "failed"
+            db.commit()
+        finally:
+            db.close()
+
+    def _recover(self):
+        """Requeues deliveries that were in flight when the previous process stopped."""
+        db = database.SessionLocal()
+        try:
+            db.query(models.AlertDelivery).filter(models.AlertDelivery.status == "sending").update(
+                {models.AlertDelivery.status: "pending"}, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    async def run_once(self) -> bool:
+        """Processes one pass of the queue. Returns True if any work was done."""
+        expanded = await run_in_threadpool(self._expand_queued_alerts)
+        jobs = await run_in_threadpool(self._claim_due)
+        if jobs:
+            semaphore = asyncio.Semaphore(self.workers)
+            results = await asyncio.gather(*(self._deliver(job, semaphore) for job in jobs))
+            await run_in_threadpool(self._record_results, results)
+        return bool(expanded or jobs)
+
+    async def _run(self):
+        while True:
+            try:
+                busy = await self.run_once()
+            except Exception as e:
+                print(f"Emergency dispatch error: {e}")
+                busy = False
+            if not busy:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+
+    async def start(self):
+        if self.notifier is None:
+            self.notifier = notifiers.get_notifier()
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        await run_in_threadpool(self._recover)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loop = None
+
+
+dispatcher = EmergencyDispatcher()
@@ -0,0 +1,166 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from fastapi.concurrency import run_in_threadpool
+
+from . import database, models
+
+# A robot that has not sent a heartbeat within this window is considered offline.
+# The bridge sends one every 10 seconds, so this tolerates two missed beats.
+HEARTBEAT_TIMEOUT = 30.0
+
+# How often pending online/offline transitions are written to the database.
+FLUSH_INTERVAL = 5.0
+
+
+class LivenessTracker:
+    """Tracks robot heartbeats in memory and batches is_online transitions to the DB.
+
+    Heartbeats only touch an in-memory dict. A background task periodically
+    compares each robot's effective state (reported flag + last-seen age)
+    with the last state written to the database and flushes only the robots
+    that changed, in a single transaction.
+    """
+
+    def __init__(self, timeout: float = HEARTBEAT_TIMEOUT, flush_interval: float = FLUSH_INTERVAL):
+        self.timeout = timeout
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        # robot_id -> (reported is_online, last seen monotonic time)
+        self._reported: Dict[int, tuple] = {}
+        # robot_id -> is_online value currently stored in the database
+        self._persisted: Dict[int, bool] = {}
+        # Robot ids known to exist, so heartbeats don't need a SELECT each time
+        self._known: Set[int] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, robot_id: int, is_online: bool, now: Optional[float] = None):
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            self._reported[robot_id] = (is_online, now)
+
+    def is_online(self, robot_id: int, now: Optional[float] = None) -> bool:
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            entry = self._reported.get(robot_id)
+        return self._effective(entry, now)
+
+    def last_seen(self, robot_id: int) -> Optional[float]:
+        """Seconds since the robot's last heartbeat, or None if never seen."""
+        with self._lock:
+            entry = self._reported.get(robot_id)
+        if entry is None:
+            return None
+        return time.monotonic() - entry[1]
+
+    def _effective(self, entry, now: float) -> bool:
+        if entry is None:
+            return False
+        reported, seen = entry
+        return reported and (now - seen) <= self.timeout
+
+    def unknown_ids(self, db, robot_ids: Iterable[int]) -> List[int]:
+        """Returns the ids that do not exist in the DB, caching the ones that do."""
+        with self._lock:
+            missing = {robot_id for robot_id in robot_ids if robot_id not in self._known}
+        if not missing:
+            return []
+        rows = db.query(models.Robot.id, models.Robot.is_online).filter(models.Robot.id.in_(missing)).all()
+        with self._lock:
+            for robot_id, is_online in rows:
+                self._known.add(robot_id)
+                self._persisted.setdefault(robot_id, bool(is_online))
+        return sorted(missing - {row[0] for row in rows})
+
+    def pending_transitions(self, now: Optional[float] = None) -> Dict[int, bool]:
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            changes = {}
+            for robot_id, entry in self._reported.items():
+                state = self._effective(entry, now)
+                if self._persisted.get(robot_id) != state:
+                    changes[robot_id] = state
+            return changes
+
+    def flush(self, now: Optional[float] = None) -> int:
+        """Writes pending transitions in one transaction. Returns the number of robots updated."""
+        changes = self.pending_transitions(now)
+        if not changes:
+            return 0
+
+        online = [robot_id for robot_id, state in changes.items() if state]
+        offline = [robot_id for robot_id, state in changes.items() if not state]
+
+        db = database.SessionLocal()
+        try:
+            if online:
+                db.query(models.Robot).filter(models.Robot.id.in_(online)).update(
+                    {models.Robot.is_online: True}, synchronize_session=False
+                )
+            if offline:
+                db.query(models.Robot).filter(models.Robot.id.in_(offline)).update(
+                    {models.Robot.is_online: False}, synchronize_session=False
+                )
+            db.commit()
+        finally:
+            db.close()
+
+        with self._lock:
+            self._persisted.update(changes)
+            # Robots that went offline and stayed quiet no longer need tracking
+            for robot_id in offline:
+                entry = self._reported.get(robot_id)
+                if entry is not None and not self._effective(entry, time.monotonic()):
+                    del self._reported[robot_id]
+        return len(changes)
+
+    def load_online_robots(self, now: Optional[float] = None):
+        """Seeds the tracker with robots the DB still reports as online.
+
+        They get a fresh grace period; if their bridge doesn't check in before
+        the timeout, the next flush marks them offline instead of leaving them
+        stuck "online" after a crash or restart.
+        """
+        db = database.SessionLocal()
+        try:
+            rows = db.query(models.Robot.id).filter(models.Robot.is_online == True).all()  # noqa: E712
+        finally:
+            db.close()
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            for (robot_id,) in rows:
+                self._known.add(robot_id)
+                self._persisted[robot_id] = True
+                self._reported.setdefault(robot_id, (True, now))
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await run_in_threadpool(self.flush)
+            except Exception as e:
+                print(f"Liveness flush error: {e}")
+
+    async def start(self):
+        await run_in_threadpool(self.load_online_robots)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Persist whatever changed since the last tick
+        await run_in_threadpool(self.flush)
+
+
+tracker = LivenessTracker()
@@ -1,20 +1,35 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from . import models, database
+from fastapi.concurrency import run_in_threadpool
+from . import database, liveness, dispatch, ratelimit, recording
 from .routers import auth, robots, emergency
 
-# Create Database Tables
-models.Base.metadata.create_all(bind=database.engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Bring the schema up to date (alembic upgrade head); migrations are the only source of truth
+    await run_in_threadpool(database.run_migrations)
+    await liveness.tracker.start()
+    await dispatch.dispatcher.start()
+    recording.recorder.start_writer()
+    yield
+    await dispatch.dispatcher.stop()
+    await liveness.tracker.stop()
+    await run_in_threadpool(recording.recorder.shutdown)
 
-app = FastAPI(title="Robot Companion API", version="0.1.0")
+app = FastAPI(title="Robot Companion API", version="0.1.0", lifespan=lifespan)
 
 from fastapi.middleware.cors import CORSMiddleware
 
+# Added before CORS so 429/413 rejections still carry CORS headers
+app.add_middleware(ratelimit.RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*", "https://statuesque-pie-a5ba4e.netlify.app"],  # Allows all origins + explicit Netlify
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    expose_headers=["X-Next-Cursor", "X-Frame-Timestamp"],  # Pagination cursor, recorded frame time
 )
 
 app.include_router(auth.router)
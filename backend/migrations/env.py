@@ -0,0 +1,44 @@
+import os
+import sys
+from logging.config import fileConfig
+
+from alembic import context
+
+# Make the backend package importable when alembic is run from any directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend import database, models  # noqa: E402
+
+config = context.config
+# Keep the app's loggers (uvicorn) intact when migrations run at startup
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = models.Base.metadata
+
+
+def run_migrations_offline():
+    context.configure(
+        url=database.SQLALCHEMY_DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    # database.run_migrations() passes the app's engine; the alembic CLI uses the default one
+    engine = config.attributes.get("engine", database.engine)
+    with engine.connect() as connection:
+        # SQLite can't ALTER most things in place; batch mode rebuilds tables when needed
+        context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=True)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
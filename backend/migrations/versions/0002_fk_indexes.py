@@ -0,0 +1,31 @@
+"""Index robots.owner_id and emergency_contacts.user_id
+
+Revision ID: 0002_fk_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002_fk_indexes"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+
+def _has_index(table, name):
+    return any(index["name"] == name for index in sa.inspect(op.get_bind()).get_indexes(table))
+
+
+def upgrade():
+    # create_all on a fresh database already builds these from the models
+    if not _has_index("robots", "ix_robots_owner_id"):
+        op.create_index("ix_robots_owner_id", "robots", ["owner_id"])
+    if not _has_index("emergency_contacts", "ix_emergency_contacts_user_id"):
+        op.create_index("ix_emergency_contacts_user_id", "emergency_contacts", ["user_id"])
+
+
+def downgrade():
+    op.drop_index("ix_emergency_contacts_user_id", table_name="emergency_contacts")
+    op.drop_index("ix_robots_owner_id", table_name="robots")
@@ -0,0 +1,54 @@
+"""Emergency alert queue and per-contact delivery status
+
+Revision ID: 0003_emergency_dispatch
+Revises: 0002_fk_indexes
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003_emergency_dispatch"
+down_revision = "0002_fk_indexes"
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    # Skip tables a previous create_all already built
+    if _has_table("emergency_alerts"):
+        return
+
+    op.create_table(
+        "emergency_alerts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_emergency_alerts_id", "emergency_alerts", ["id"])
+    op.create_index("ix_emergency_alerts_user_created", "emergency_alerts", ["user_id", "created_at"])
+
+    op.create_table(
+        "alert_deliveries",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("alert_id", sa.Integer(), sa.ForeignKey("emergency_alerts.id"), nullable=True),
+        sa.Column("contact_id", sa.Integer(), sa.ForeignKey("emergency_contacts.id"), nullable=True),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=True),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_alert_deliveries_id", "alert_deliveries", ["id"])
+    op.create_index("ix_alert_deliveries_alert_id", "alert_deliveries", ["alert_id"])
+    op.create_index("ix_alert_deliveries_due", "alert_deliveries", ["status", "next_attempt_at"])
+
+
+def downgrade():
+    op.drop_table("alert_deliveries")
+    op.drop_table("emergency_alerts")
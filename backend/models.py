@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
@@ -24,7 +24,7 @@ class Robot(Base):
     name = Column(String)
     model_type = Column(String, default="MiRo-e")
     is_online = Column(Boolean, default=False)
-    owner_id = Column(Integer, ForeignKey("users.id"))
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True)
     
     owner = relationship("User", back_populates="robots")
 
@@ -35,6 +35,34 @@ class EmergencyContact(Base):
     name = Column(String)
     phone_number = Column(String)
     relation = Column(String)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
 
     user = relationship("User", back_populates="emergency_contacts")
+
+class EmergencyAlert(Base):
+    __tablename__ = "emergency_alerts"
+    __table_args__ = (Index("ix_emergency_alerts_user_created", "user_id", "created_at"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    status = Column(String, default="queued") # queued, dispatching, completed, failed
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    user = relationship("User")
+    deliveries = relationship("AlertDelivery", back_populates="alert")
+
+class AlertDelivery(Base):
+    __tablename__ = "alert_deliveries"
+    __table_args__ = (Index("ix_alert_deliveries_due", "status", "next_attempt_at"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    alert_id = Column(Integer, ForeignKey("emergency_alerts.id"), index=True)
+    contact_id = Column(Integer, ForeignKey("emergency_contacts.id"))
+    status = Column(String, default="pending") # pending, sending, sent, failed
+    attempts = Column(Integer, default=0)
+    last_error = Column(String, nullable=True)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    alert = relationship("EmergencyAlert", back_populates="deliveries")
+    contact = relationship("EmergencyContact")
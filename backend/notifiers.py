@@ -0,0 +1,84 @@
+import os
+from typing import Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+
+class NotifierError(Exception):
+    """Raised by a notifier when a delivery failed and should be retried."""
+
+
+class Notifier:
+    """Base class for emergency notification backends.
+
+    `send` receives one delivery job (a dict with the alert, user and contact
+    details built by the dispatcher) and must raise NotifierError on failure.
+    """
+
+    name = "base"
+
+    async def send(self, job: Dict):
+        raise NotImplementedError
+
+
+class LogNotifier(Notifier):
+    """Prints the notification. Default backend for local development."""
+
+    name = "log"
+
+    async def send(self, job: Dict):
+        print(f"NOTIFY {job['contact_name']} ({job['phone_number']}): "
+              f"Emergency for {job['user_name'] or job['user_email']} (alert {job['alert_id']})")
+
+
+class WebhookNotifier(Notifier):
+    """POSTs the delivery job as JSON to an external service (SMS/voice gateway, etc)."""
+
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    async def send(self, job: Dict):
+        # requests is only needed by this backend, so don't pay for it at API startup
+        import requests
+
+        try:
+            resp = await run_in_threadpool(requests.post, self.url, json=job, timeout=self.timeout)
+            resp.raise_for_status()
+        except requests.RequestException as e:
+            raise NotifierError(str(e))
+
+
+class FakeNotifier(Notifier):
+    """In-memory notifier for tests. Fails the first `fail_times` attempts of each delivery."""
+
+    name = "fake"
+
+    def __init__(self, fail_times: int = 0):
+        self.fail_times = fail_times
+        self.sent: List[Dict] = []
+        self.attempts: Dict[int, int] = {}
+
+    async def send(self, job: Dict):
+        count = self.attempts.get(job["delivery_id"], 0) + 1
+        self.attempts[job["delivery_id"]] = count
+        if count <= self.fail_times:
+            raise NotifierError(f"fake failure {count}/{self.fail_times}")
+        self.sent.append(job)
+
+
+def get_notifier(name: Optional[str] = None) -> Notifier:
+    """Builds the notifier selected by EMERGENCY_NOTIFIER (log, webhook or fake)."""
+    name = name or os.environ.get("EMERGENCY_NOTIFIER", "log")
+    if name == "log":
+        return LogNotifier()
+    if name == "webhook":
+        url = os.environ.get("EMERGENCY_WEBHOOK_URL")
+        if not url:
+            raise ValueError("EMERGENCY_WEBHOOK_URL must be set for the webhook notifier")
+        return WebhookNotifier(url)
+    if name == "fake":
+        return FakeNotifier()
+    raise ValueError(f"Unknown emergency notifier: {name}")
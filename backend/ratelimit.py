@@ -0,0 +1,212 @@
+import json
+import math
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from jose import JWTError, jwt
+from starlette.exceptions import HTTPException
+
+from . import auth
+
+# Largest camera frame accepted by POST /robots/{id}/camera (a 640x480 JPEG is ~30-80 KB)
+MAX_FRAME_BYTES = 2 * 1024 * 1024
+
+
+class RateLimit:
+    """Token bucket: `rate` requests per second sustained, bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+
+
+class InMemoryRateLimitStore:
+    """Token buckets kept in this process. Fine for a single API instance."""
+
+    def __init__(self, max_keys: int = 100_000, idle_seconds: float = 60.0, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.idle_seconds = idle_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        # key -> [tokens, last update (monotonic)]
+        self._buckets: Dict[str, list] = {}
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        """Consumes one token. Returns 0 if allowed, else seconds until a token is available."""
+        return self.take_sync(key, limit)
+
+    def take_sync(self, key: str, limit: RateLimit, now: Optional[float] = None) -> float:
+        if now is None:
+            now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._prune(now)
+                bucket = self._buckets[key] = [float(limit.burst), now]
+            else:
+                bucket[0] = min(limit.burst, bucket[0] + (now - bucket[1]) * limit.rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / limit.rate
+
+    def _prune(self, now: float):
+        idle = [key for key, (_, updated) in self._buckets.items() if now - updated > self.idle_seconds]
+        for key in idle:
+            del self._buckets[key]
+
+
+class RedisRateLimitStore:
+    """Token buckets in Redis, shared by every API instance behind a load balancer."""
+
+    SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        # asyncio client, so the round-trip doesn't block the event loop
+        import redis.asyncio
+
+        self.prefix = prefix
+        self._client = redis.asyncio.Redis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        # Wall-clock time, since buckets are shared across hosts
+        return float(await self._script(keys=[self.prefix + key], args=[limit.rate, limit.burst, time.time()]))
+
+
+def get_store():
+    """Redis store if RATE_LIMIT_REDIS_URL is set, otherwise in-memory."""
+    url = os.environ.get("RATE_LIMIT_REDIS_URL")
+    if url:
+        return RedisRateLimitStore(url)
+    return InMemoryRateLimitStore()
+
+
+# (name, method, path pattern, scope, limit). Scopes:
+#   "robot_client"  the robot id in the path plus the client address; camera uploads come
+#                   from unauthenticated bridges, so a bucket per robot alone could be
+#                   drained by anyone to lock out the real bridge
+#   "robot_user"    the robot id plus the authenticated user; requests without a valid
+#                   token don't touch it, so nobody can exhaust another user's robot bucket
+#   "user"          the authenticated user, or the client address without a valid token
+RULES: List[Tuple[str, str, "re.Pattern", str, RateLimit]] = [
+    ("camera", "POST", re.compile(r"^/robots/(\d+)/camera$"), "robot_client", RateLimit(rate=20, burst=40)),
+    ("command", "POST", re.compile(r"^/robots/(\d+)/command$"), "robot_user", RateLimit(rate=20, burst=40)),
+    ("command", "POST", re.compile(r"^/robots/(\d+)/command$"), "user", RateLimit(rate=50, burst=100)),
+]
+
+CAMERA_UPLOAD = re.compile(r"^/robots/\d+/camera$")
+
+
+def _token_subject(scope) -> Optional[str]:
+    """The `sub` of a valid bearer token, or None."""
+    headers = dict(scope["headers"])
+    authorization = headers.get(b"authorization", b"").decode("latin-1")
+    if authorization.lower().startswith("bearer "):
+        try:
+            payload = jwt.decode(authorization[7:], auth.SECRET_KEY, algorithms=[auth.ALGORITHM])
+            return payload.get("sub")
+        except JWTError:
+            pass
+    return None
+
+
+def _client_key(scope) -> str:
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """ASGI middleware enforcing per-robot/per-user token buckets and frame size caps.
+
+    Runs before the request body is read, so rejected requests cost neither
+    multipart parsing nor buffering the upload.
+    """
+
+    def __init__(self, app, store=None, rules=RULES, max_frame_bytes: int = MAX_FRAME_BYTES):
+        self.app = app
+        self.store = store if store is not None else get_store()
+        self.rules = rules
+        self.max_frame_bytes = max_frame_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method, path = scope["method"], scope["path"]
+        retry_after = 0.0
+        subject, decoded = None, False
+        for name, rule_method, pattern, rule_scope, limit in self.rules:
+            if method != rule_method:
+                continue
+            match = pattern.match(path)
+            if not match:
+                continue
+            if rule_scope != "robot_client" and not decoded:
+                subject, decoded = _token_subject(scope), True
+
+            if rule_scope == "robot_client":
+                key = f"robot:{match.group(1)}:{_client_key(scope)}"
+            elif rule_scope == "robot_user":
+                if subject is None:
+                    continue
+                key = f"robot:{match.group(1)}:user:{subject}"
+            elif subject is not None:
+                key = f"user:{subject}"
+            else:
+                key = _client_key(scope)
+            retry_after = max(retry_after, await self.store.take(f"{name}:{key}", limit))
+
+        if retry_after > 0:
+            await self._reject(send, 429, "Rate limit exceeded", {"retry-after": str(max(1, math.ceil(retry_after)))})
+            return
+
+        if method == "POST" and CAMERA_UPLOAD.match(path):
+            content_length = dict(scope["headers"]).get(b"content-length", b"")
+            if content_length.isdigit() and int(content_length) > self.max_frame_bytes:
+                await self._reject(send, 413, "Frame too large")
+                return
+            receive = self._capped_receive(receive)
+
+        await self.app(scope, receive, send)
+
+    def _capped_receive(self, receive):
+        # Chunked uploads have no Content-Length; count bytes as they arrive
+        received = 0
+
+        async def capped():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_frame_bytes:
+                    raise HTTPException(status_code=413, detail="Frame too large")
+            return message
+
+        return capped
+
+    async def _reject(self, send, status: int, detail: str, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps({"detail": detail}).encode()
+        raw_headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        raw_headers += [(name.encode(), value.encode()) for name, value in (headers or {}).items()]
+        await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,280 @@
+import bisect
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Recordings live under RECORDINGS_DIR/<robot_id>/ as pairs of files per segment:
+#   <start_ms>.jpgs  concatenated JPEG frames
+#   <start_ms>.idx   one INDEX_RECORD per frame: timestamp (ms), offset and length in .jpgs
+RECORDINGS_DIR = os.environ.get("RECORDINGS_DIR", "./recordings")
+
+INDEX_RECORD = struct.Struct("<QQI")
+
+# A segment is closed and a new one started past either limit
+SEGMENT_MAX_BYTES = 32 * 1024 * 1024
+SEGMENT_MAX_SECONDS = 300
+
+# Retention per robot: oldest segments are deleted beyond either limit
+RETENTION_MAX_BYTES = 1024 * 1024 * 1024
+RETENTION_MAX_SECONDS = 24 * 3600
+
+# Frames waiting for the writer thread; new frames are dropped when it's full
+QUEUE_SIZE = 256
+
+# How often the writer thread applies retention to every robot's recordings
+RETENTION_INTERVAL = 60.0
+
+
+class _OpenSegment:
+    def __init__(self, directory: str, start_ms: int):
+        self.start_ms = start_ms
+        self.data = open(os.path.join(directory, f"{start_ms}.jpgs"), "ab")
+        self.index = open(os.path.join(directory, f"{start_ms}.idx"), "ab")
+        self.size = self.data.tell()
+
+    def append(self, timestamp_ms: int, frame: bytes):
+        # Data first, then index, so readers never see an index entry past the data
+        self.data.write(frame)
+        self.data.flush()
+        self.index.write(INDEX_RECORD.pack(timestamp_ms, self.size, len(frame)))
+        self.index.flush()
+        self.size += len(frame)
+
+    def close(self):
+        self.data.close()
+        self.index.close()
+
+
+class FrameRecorder:
+    """Appends camera frames of recording robots to rotating, indexed segment files.
+
+    `submit` is called from the upload endpoint and only enqueues the frame; a
+    single writer thread owns the files, rotates segments and applies the
+    retention policy. Reads go straight to disk through the index files and
+    memory-mapped segment data.
+    """
+
+    def __init__(self, root: str = RECORDINGS_DIR, segment_max_bytes: int = SEGMENT_MAX_BYTES,
+                 segment_max_seconds: float = SEGMENT_MAX_SECONDS, retention_max_bytes: int = RETENTION_MAX_BYTES,
+                 retention_max_seconds: float = RETENTION_MAX_SECONDS, retention_interval: float = RETENTION_INTERVAL):
+        self.root = root
+        self.segment_max_bytes = segment_max_bytes
+        self.segment_max_seconds = segment_max_seconds
+        self.retention_max_bytes = retention_max_bytes
+        self.retention_max_seconds = retention_max_seconds
+        self.retention_interval = retention_interval
+        self.dropped_frames = 0
+        self._recording = set()
+        self._open: Dict[int, _OpenSegment] = {}
+        self._queue: "queue.Queue" = queue.Queue(maxsize=QUEUE_SIZE)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    # Control
+
+    def start_writer(self):
+        """Starts the writer thread, which also enforces retention while nothing is recording."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="frame-recorder", daemon=True)
+                self._thread.start()
+
+    def start(self, robot_id: int):
+        with self._lock:
+            self._recording.add(robot_id)
+        self.start_writer()
+
+    def stop(self, robot_id: int):
+        with self._lock:
+            self._recording.discard(robot_id)
+        self._enqueue(("close", robot_id, None, None))
+
+    def is_recording(self, robot_id: int) -> bool:
+        return robot_id in self._recording
+
+    def shutdown(self):
+        """Closes all segments and stops the writer thread after draining the queue."""
+        with self._lock:
+            self._recording.clear()
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(("shutdown", None, None, None))
+            thread.join()
+
+    def submit(self, robot_id: int, frame: bytes, timestamp: Optional[float] = None):
+        if robot_id not in self._recording:
+            return
+        timestamp_ms = int((timestamp if timestamp is not None else time.time()) * 1000)
+        self._enqueue(("frame", robot_id, timestamp_ms, frame))
+
+    def _enqueue(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # Never block ingest on disk; a dropped frame is better than a slow upload
+            self.dropped_frames += 1
+
+    # Writer thread
+
+    def _robot_dir(self, robot_id: int) -> str:
+        return os.path.join(self.root, str(robot_id))
+
+    def _run(self):
+        next_retention = time.monotonic()
+        while True:
+            if time.monotonic() >= next_retention:
+                try:
+                    self.apply_retention_all()
+                except OSError as e:
+                    print(f"Recording retention error: {e}")
+                next_retention = time.monotonic() + self.retention_interval
+            try:
+                kind, robot_id, timestamp_ms, frame = self._queue.get(timeout=self.retention_interval)
+            except queue.Empty:
+                continue
+            try:
+                if kind == "frame":
+                    self._write(robot_id, timestamp_ms, frame)
+                elif kind == "close":
+                    self._close(robot_id)
+                    self._apply_retention(robot_id)
+                elif kind == "shutdown":
+                    for open_robot_id in list(self._open):
+                        self._close(open_robot_id)
+                    return
+            except OSError as e:
+                print(f"Recording error for Robot {robot_id}: {e}")
+
+    def _write(self, robot_id: int, timestamp_ms: int, frame: bytes):
+        segment = self._open.get(robot_id)
+        if segment is not None and (
+            segment.size + len(frame) > self.segment_max_bytes
+            or timestamp_ms - segment.start_ms > self.segment_max_seconds * 1000
+        ):
+            self._close(robot_id)
+            segment = None
+        if segment is None:
+            directory = self._robot_dir(robot_id)
+            os.makedirs(directory, exist_ok=True)
+            segment = self._open[robot_id] = _OpenSegment(directory, timestamp_ms)
+            self._apply_retention(robot_id)
+        segment.append(timestamp_ms, frame)
+
+    def _close(self, robot_id: int):
+        segment = self._open.pop(robot_id, None)
+        if segment is not None:
+            segment.close()
+
+    def apply_retention_all(self):
+        """Applies the retention policy to every robot with recordings on disk."""
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return
+        for name in names:
+            if name.isdigit():
+                self._apply_retention(int(name))
+
+    def _apply_retention(self, robot_id: int):
+        directory = self._robot_dir(robot_id)
+        open_segment = self._open.get(robot_id)
+        segments = [s for s in self.segments(robot_id) if open_segment is None or s["start_ms"] != open_segment.start_ms]
+        total = sum(s["bytes"] for s in segments)
+        cutoff_ms = (time.time() - self.retention_max_seconds) * 1000
+        # Oldest first
+        for s in segments:
+            if total <= self.retention_max_bytes and s["end_ms"] >= cutoff_ms:
+                break
+            for ext in (".jpgs", ".idx"):
+                try:
+                    os.remove(os.path.join(directory, f"{s['start_ms']}{ext}"))
+                except FileNotFoundError:
+                    pass
+            total -= s["bytes"]
+
+    # Reading
+
+    def segments(self, robot_id: int) -> List[Dict]:
+        """Segments on disk, oldest first: start/end timestamps (ms), frame count and size."""
+        directory = self._robot_dir(robot_id)
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+        result = []
+        for start_ms in sorted(int(name[:-4]) for name in names if name.endswith(".idx")):
+            index_path = os.path.join(directory, f"{start_ms}.idx")
+            index_size = os.path.getsize(index_path)
+            frames = index_size // INDEX_RECORD.size
+            if frames == 0:
+                continue
+            with open(index_path, "rb") as f:
+                f.seek((frames - 1) * INDEX_RECORD.size)
+                end_ms, offset, length = INDEX_RECORD.unpack(f.read(INDEX_RECORD.size))
+            result.append({"start_ms": start_ms, "end_ms": end_ms, "frames": frames, "bytes": offset + length})
+        return result
+
+    def _read_index(self, robot_id: int, start_ms: int) -> List[Tuple[int, int, int]]:
+        with open(os.path.join(self._robot_dir(robot_id), f"{start_ms}.idx"), "rb") as f:
+            data = f.read()
+        # Ignore a trailing partial record from a concurrent append
+        usable = len(data) - len(data) % INDEX_RECORD.size
+        return list(INDEX_RECORD.iter_unpack(data[:usable]))
+
+    def seek(self, robot_id: int, start_ms: int, end_ms: int) -> List[Tuple[int, int, int, int]]:
+        """Index entries (segment start, timestamp, offset, length) with start_ms <= timestamp <= end_ms."""
+        entries = []
+        for s in self.segments(robot_id):
+            if s["end_ms"] < start_ms or s["start_ms"] > end_ms:
+                continue
+            records = self._read_index(robot_id, s["start_ms"])
+            timestamps = [r[0] for r in records]
+            lo = bisect.bisect_left(timestamps, start_ms)
+            hi = bisect.bisect_right(timestamps, end_ms)
+            entries.extend((s["start_ms"],) + r for r in records[lo:hi])
+        return entries
+
+    def frame_at(self, robot_id: int, at_ms: int) -> Optional[Tuple[int, bytes]]:
+        """The last frame recorded at or before at_ms, as (timestamp, jpeg)."""
+        for s in reversed(self.segments(robot_id)):
+            if s["start_ms"] > at_ms:
+                continue
+            records = self._read_index(robot_id, s["start_ms"])
+            i = bisect.bisect_right([r[0] for r in records], at_ms) - 1
+            if i < 0:
+                continue
+            frames = list(self.read_frames(robot_id, [(s["start_ms"],) + records[i]]))
+            return frames[0] if frames else None
+        return None
+
+    def read_frames(self, robot_id: int, entries) -> Iterator[Tuple[int, bytes]]:
+        """Yields (timestamp, jpeg) for seek() entries, reading segments through mmap."""
+        directory = self._robot_dir(robot_id)
+        current_segment, current_file, current_map = None, None, None
+        try:
+            for segment_start, timestamp_ms, offset, length in entries:
+                if segment_start != current_segment:
+                    if current_map is not None:
+                        current_map.close()
+                        current_file.close()
+                    current_file = open(os.path.join(directory, f"{segment_start}.jpgs"), "rb")
+                    current_map = mmap.mmap(current_file.fileno(), 0, access=mmap.ACCESS_READ)
+                    current_segment = segment_start
+                if offset + length > len(current_map):
+                    # The open segment grew since it was mapped; map it again
+                    current_map.close()
+                    current_map = mmap.mmap(current_file.fileno(), 0, access=mmap.ACCESS_READ)
+                    if offset + length > len(current_map):
+                        continue
+                yield timestamp_ms, current_map[offset:offset + length]
+        finally:
+            if current_map is not None:
+                current_map.close()
+                current_file.close()
+
+
+recorder = FrameRecorder()
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response, Query
 from sqlalchemy.orm import Session
-from typing import List
-from .. import database, schemas, models, auth
+from typing import List, Optional
+from datetime import datetime
+from .. import database, schemas, models, auth, dispatch
 
 router = APIRouter(
     prefix="/emergency",
@@ -19,6 +20,22 @@ class EmergencyContact(EmergencyContactCreate):
     class Config:
         from_attributes = True
 
+class AlertDelivery(schemas.BaseModel):
+    contact_id: int
+    status: str
+    attempts: int
+    last_error: Optional[str] = None
+    class Config:
+        from_attributes = True
+
+class EmergencyAlert(schemas.BaseModel):
+    id: int
+    status: str
+    created_at: datetime
+    deliveries: List[AlertDelivery] = []
+    class Config:
+        from_attributes = True
+
 @router.post("/", response_model=EmergencyContact)
 def create_contact(contact: EmergencyContactCreate, current_user: schemas.User = Depends(auth.get_current_user), db: Session = Depends(database.get_db)):
     db_contact = models.EmergencyContact(**contact.dict(), user_id=current_user.id)
@@ -27,13 +44,43 @@ def create_contact(contact: EmergencyContactCreate, current_user: schemas.User =
     db.refresh(db_contact)
     return db_contact
 
+CONTACT_LIST_COLUMNS = (
+    models.EmergencyContact.id,
+    models.EmergencyContact.name,
+    models.EmergencyContact.phone_number,
+    models.EmergencyContact.relation,
+    models.EmergencyContact.user_id,
+)
+
 @router.get("/", response_model=List[EmergencyContact])
-def read_contacts(current_user: schemas.User = Depends(auth.get_current_user), db: Session = Depends(database.get_db)):
-    return db.query(models.EmergencyContact).filter(models.EmergencyContact.user_id == current_user.id).all()
+def read_contacts(response: Response, after_id: Optional[int] = None, limit: int = Query(100, ge=1, le=500), current_user: schemas.User = Depends(auth.get_current_user), db: Session = Depends(database.get_db)):
+    # Same keyset pagination as GET /robots/: follow X-Next-Cursor via after_id.
+    query = db.query(*CONTACT_LIST_COLUMNS).filter(models.EmergencyContact.user_id == current_user.id)
+    if after_id is not None:
+        query = query.filter(models.EmergencyContact.id > after_id)
+    contacts = query.order_by(models.EmergencyContact.id).limit(limit + 1).all()
+    if len(contacts) > limit:
+        contacts = contacts[:limit]
+        response.headers["X-Next-Cursor"] = str(contacts[-1].id)
+    return contacts
 
 @router.post("/trigger")
-def trigger_emergency(current_user: schemas.User = Depends(auth.get_current_user)):
-    # Mock emergency trigger
-    print(f"EMERGENCY TRIGGERED for User {current_user.id} ({current_user.email})!")
-    # Logic to notify contacts/services would go here
-    return {"status": "alert_sent", "message": "Emergency services and contacts have been notifed."}
+def trigger_emergency(current_user: schemas.User = Depends(auth.get_current_user), db: Session = Depends(database.get_db)):
+    # Only queues the alert; contacts are notified by the background dispatcher
+    alert, deduplicated = dispatch.dispatcher.enqueue(db, current_user.id)
+    print(f"EMERGENCY TRIGGERED for User {current_user.id} ({current_user.email})! Alert {alert.id}")
+    return {
+        "status": "alert_sent",
+        "message": "Emergency services and contacts are being notified.",
+        "alert_id": alert.id,
+        "deduplicated": deduplicated,
+    }
+
+@router.get("/alerts/{alert_id}", response_model=EmergencyAlert)
+def read_alert(alert_id: int, current_user: schemas.User = Depends(auth.get_current_user), db: Session = Depends(database.get_db)):
+    alert = db.query(models.EmergencyAlert).filter(
+        models.EmergencyAlert.id == alert_id, models.EmergencyAlert.user_id == current_user.id
+    ).first()
+    if not alert:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    return alert
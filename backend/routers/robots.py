@@ -1,15 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, File, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, File, UploadFile, Query
+from fastapi.concurrency import iterate_in_threadpool
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
+import asyncio
 import time
 import io
-from PIL import Image, ImageDraw
-from .. import database, schemas, models, auth
+from functools import lru_cache
+from pydantic import Field
+from .. import database, schemas, models, auth, liveness, recording, wire
+
+# Velocities are packed as float32 in the binary command encoding; anything beyond this is a client bug
+MAX_COMMAND_VELOCITY = 1e3
 
 class RobotCommand(schemas.BaseModel):
-    linear_x: float
-    angular_z: float
+    linear_x: float = Field(ge=-MAX_COMMAND_VELOCITY, le=MAX_COMMAND_VELOCITY)
+    angular_z: float = Field(ge=-MAX_COMMAND_VELOCITY, le=MAX_COMMAND_VELOCITY)
 
 router = APIRouter(
     prefix="/robots",
@@ -29,38 +35,80 @@ def register_robot(robot: schemas.RobotCreate, current_user: schemas.User = Depe
     db.refresh(db_robot)
     return db_robot
 
+# Only the columns schemas.Robot needs, so listing doesn't build full ORM objects
+ROBOT_LIST_COLUMNS = (
+    models.Robot.id,
+    models.Robot.serial_number,
+    models.Robot.name,
+    models.Robot.model_type,
+    models.Robot.is_online,
+    models.Robot.owner_id,
+)
+
 @router.get("/", response_model=List[schemas.Robot])
-def read_robots(skip: int = 0, limit: int = 100, current_user: schemas.User = Depends(auth.get_current_user), db: Session = Depends(database.get_db)):
-    robots = db.query(models.Robot).filter(models.Robot.owner_id == current_user.id).offset(skip).limit(limit).all()
+def read_robots(response: Response, after_id: Optional[int] = None, limit: int = Query(100, ge=1, le=500), skip: int = Query(0, ge=0, deprecated=True), current_user: schemas.User = Depends(auth.get_current_user), db: Session = Depends(database.get_db)):
+    # Keyset pagination: pass the X-Next-Cursor header value back as after_id to get the next page.
+    # Served by the owner_id index (SQLite appends the rowid id to it), so deep pages stay cheap.
+    # `skip` is the old offset parameter, still honoured for existing clients.
+    query = db.query(*ROBOT_LIST_COLUMNS).filter(models.Robot.owner_id == current_user.id)
+    if after_id is not None:
+        query = query.filter(models.Robot.id > after_id)
+    robots = query.order_by(models.Robot.id).offset(skip).limit(limit + 1).all()
+    if len(robots) > limit:
+        robots = robots[:limit]
+        response.headers["X-Next-Cursor"] = str(robots[-1].id)
     return robots
 
+@router.post("/status")
+def update_robot_statuses(batch: schemas.RobotStatusBatch, db: Session = Depends(database.get_db)):
+    # Bulk heartbeat for fleet bridges that manage many robots in one process.
+    # Only touches the in-memory tracker; transitions are flushed to the DB in the background.
+    robot_ids = {s.robot_id for s in batch.statuses}
+    unknown = set(liveness.tracker.unknown_ids(db, robot_ids))
+    # A robot listed more than once takes its last status
+    for s in batch.statuses:
+        if s.robot_id not in unknown:
+            liveness.tracker.record(s.robot_id, s.is_online)
+    return {"status": "updated", "updated": len(robot_ids - unknown), "unknown": sorted(unknown)}
+
 @router.post("/{robot_id}/status")
 def update_robot_status(robot_id: int, is_online: bool, db: Session = Depends(database.get_db)):
     # This endpoint might be called by the robot itself (needs API key or cert in real life)
     # For now, we allow it to be open or use a shared secret.
-    robot = db.query(models.Robot).filter(models.Robot.id == robot_id).first()
-    if not robot:
+    if liveness.tracker.unknown_ids(db, [robot_id]):
         raise HTTPException(status_code=404, detail="Robot not found")
     
-    robot.is_online = is_online
-    db.commit()
+    liveness.tracker.record(robot_id, is_online)
     return {"status": "updated", "is_online": is_online}
 
 # In-memory storage for the latest command of each robot
 # robot_id -> RobotCommand
 latest_commands = {}
 
+# The same command pre-encoded in the binary wire format, with a per-robot sequence number
+# robot_id -> bytes
+latest_command_frames = {}
+command_seq = {}
+
 @router.post("/{robot_id}/command")
 def send_command(robot_id: int, command: RobotCommand, current_user: schemas.User = Depends(auth.get_current_user)):
     # Store the command for the robot to pick up
     print(f"COMMAND to Robot {robot_id}: Linear={command.linear_x}, Angular={command.angular_z}")
     latest_commands[robot_id] = command
+    # Encode once here rather than on every poll
+    seq = command_seq[robot_id] = command_seq.get(robot_id, 0) + 1
+    latest_command_frames[robot_id] = wire.encode_command(seq, time.time(), command.linear_x, command.angular_z)
     return {"status": "sent", "command": command}
 
 @router.get("/{robot_id}/command", response_model=RobotCommand)
-def get_command(robot_id: int):
+def get_command(robot_id: int, request: Request, response: Response):
     # Retrieve the latest command for the robot
     # Default to stop if no command found
+    # Bridges send "Accept: application/x-robot-command" to get the compact binary encoding
+    if wire.wants_binary(request.headers.get("accept")):
+        frame = latest_command_frames.get(robot_id, wire.STOP_COMMAND)
+        return Response(content=frame, media_type=wire.COMMAND_MEDIA_TYPE, headers={"Vary": "Accept"})
+    response.headers["Vary"] = "Accept"
     command = latest_commands.get(robot_id, RobotCommand(linear_x=0.0, angular_z=0.0))
     return command
 
@@ -69,10 +117,16 @@ async def upload_camera_frame(robot_id: int, file: UploadFile = File(...)):
     """Receives a camera frame from the robot and stores it in memory."""
     contents = await file.read()
     latest_frames[robot_id] = contents
+    # No-op unless recording is enabled for this robot; never blocks on disk
+    recording.recorder.submit(robot_id, contents)
     return {"status": "frame_received"}
 
+@lru_cache(maxsize=1)
 def get_offline_image():
-    """Generates a black 'Camera Offline' placeholder image."""
+    """Generates a black 'Camera Offline' placeholder image (once, on first use)."""
+    # Pillow is only needed for the placeholder, so it's imported lazily to keep startup fast
+    from PIL import Image, ImageDraw
+
     width, height = 640, 480
     img = Image.new('RGB', (width, height), color='black')
     d = ImageDraw.Draw(img)
@@ -91,3 +145,72 @@ def get_camera_snapshot(robot_id: int):
         frame_data = get_offline_image()
         
     return StreamingResponse(io.BytesIO(frame_data), media_type="image/jpeg")
+
+def get_owned_robot(robot_id: int, current_user: schemas.User = Depends(auth.get_current_user), db: Session = Depends(database.get_db)):
+    """Resolves robot_id only if the current user owns that robot."""
+    robot = db.query(models.Robot.id).filter(models.Robot.id == robot_id, models.Robot.owner_id == current_user.id).first()
+    if not robot:
+        raise HTTPException(status_code=404, detail="Robot not found")
+    return robot_id
+
+# Longest pause between two played-back frames, so gaps in a recording don't stall playback
+PLAYBACK_MAX_SLEEP = 1.0
+
+@router.post("/{robot_id}/recording")
+def start_recording(robot_id: int = Depends(get_owned_robot)):
+    """Starts appending this robot's camera frames to segment files on disk."""
+    recording.recorder.start(robot_id)
+    return {"status": "recording", "robot_id": robot_id}
+
+@router.delete("/{robot_id}/recording")
+def stop_recording(robot_id: int = Depends(get_owned_robot)):
+    recording.recorder.stop(robot_id)
+    return {"status": "stopped", "robot_id": robot_id}
+
+@router.get("/{robot_id}/recording")
+def get_recording(robot_id: int = Depends(get_owned_robot)):
+    """Recording state and the segments on disk (timestamps in seconds)."""
+    segments = [
+        {"start": s["start_ms"] / 1000, "end": s["end_ms"] / 1000, "frames": s["frames"], "bytes": s["bytes"]}
+        for s in recording.recorder.segments(robot_id)
+    ]
+    return {"recording": recording.recorder.is_recording(robot_id), "segments": segments}
+
+@router.get("/{robot_id}/recording/frames")
+def seek_recording(start: float, end: float, limit: int = Query(1000, ge=1, le=10000), robot_id: int = Depends(get_owned_robot)):
+    """Timestamps of the recorded frames between start and end (epoch seconds)."""
+    entries = recording.recorder.seek(robot_id, int(start * 1000), int(end * 1000))
+    return {"timestamps": [timestamp_ms / 1000 for _, timestamp_ms, _, _ in entries[:limit]], "truncated": len(entries) > limit}
+
+@router.get("/{robot_id}/recording/frame")
+def get_recorded_frame(at: float, robot_id: int = Depends(get_owned_robot)):
+    """The last recorded frame at or before `at` (epoch seconds)."""
+    found = recording.recorder.frame_at(robot_id, int(at * 1000))
+    if found is None:
+        raise HTTPException(status_code=404, detail="No recorded frame at that time")
+    timestamp_ms, frame = found
+    return Response(content=frame, media_type="image/jpeg", headers={"X-Frame-Timestamp": str(timestamp_ms / 1000)})
+
+@router.get("/{robot_id}/recording/playback")
+def play_recording(start: float, end: float, speed: float = Query(1.0, ge=0.0, le=16.0), robot_id: int = Depends(get_owned_robot)):
+    """Streams recorded frames between start and end as MJPEG (multipart/x-mixed-replace).
+
+    Frames are paced by their recorded timestamps divided by `speed` (pauses capped at
+    PLAYBACK_MAX_SLEEP); speed=0 sends them as fast as possible.
+    """
+    entries = recording.recorder.seek(robot_id, int(start * 1000), int(end * 1000))
+    if not entries:
+        raise HTTPException(status_code=404, detail="No recorded frames in that range")
+
+    async def stream():
+        # Pauses happen on the event loop; only the mmap reads borrow a threadpool worker,
+        # so a long playback doesn't hold one of the threads the sync routes run on
+        previous_ms = None
+        async for timestamp_ms, frame in iterate_in_threadpool(recording.recorder.read_frames(robot_id, entries)):
+            if speed and previous_ms is not None:
+                await asyncio.sleep(min((timestamp_ms - previous_ms) / 1000 / speed, PLAYBACK_MAX_SLEEP))
+            previous_ms = timestamp_ms
+            yield (b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: " + str(len(frame)).encode()
+                   + b"\r\n\r\n" + frame + b"\r\n")
+
+    return StreamingResponse(stream(), media_type="multipart/x-mixed-replace; boundary=frame")
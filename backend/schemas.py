@@ -43,3 +43,11 @@ class Robot(RobotBase):
 
     class Config:
         from_attributes = True
+
+# Robot Status Schemas
+class RobotStatusUpdate(BaseModel):
+    robot_id: int
+    is_online: bool
+
+class RobotStatusBatch(BaseModel):
+    statuses: List[RobotStatusUpdate]
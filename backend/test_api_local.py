@@ -58,6 +58,13 @@ def test_emergency(token):
         resp = requests.post(f"{BASE_URL}/emergency/trigger", headers=headers)
         if resp.status_code == 200:
             print("✅ Emergency Trigger Passed")
+            alert_id = resp.json()["alert_id"]
+            time.sleep(1) # Give the dispatcher a moment to fan out
+            resp = requests.get(f"{BASE_URL}/emergency/alerts/{alert_id}", headers=headers)
+            if resp.status_code == 200:
+                print(f"✅ Alert Status Passed: {resp.json()['status']}")
+            else:
+                print(f"❌ Alert Status Failed: {resp.status_code} - {resp.text}")
         else:
             print(f"❌ Emergency Trigger Failed: {resp.status_code} - {resp.text}")
     except Exception as e:
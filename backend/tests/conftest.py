@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import database, models
+
+
+@pytest.fixture
+def db_engine(tmp_path, monkeypatch):
+    """Points the app at a fresh SQLite database for the test."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    models.Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(db_engine):
+    session = database.SessionLocal()
+    yield session
+    session.close()
+
+
+def make_user(db, email="owner@example.com"):
+    user = models.User(email=email, hashed_password="x", full_name="Owner")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def make_robot(db, owner, serial="MIRO-1", is_online=False):
+    robot = models.Robot(serial_number=serial, name="Robot", owner_id=owner.id, is_online=is_online)
+    db.add(robot)
+    db.commit()
+    db.refresh(robot)
+    return robot
+
+
+@pytest.fixture
+def client(db_engine):
+    # Not used as a context manager, so the lifespan (migrations, background tasks) doesn't run
+    from fastapi.testclient import TestClient
+    from backend.main import app
+
+    return TestClient(app)
+
+
+def login(client, email="owner@example.com", password="password123"):
+    """Registers a user through the API and returns Authorization headers for it."""
+    client.post("/register", json={"email": email, "password": password, "full_name": "Owner"})
+    resp = client.post("/token", data={"username": email, "password": password})
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def register_robot(client, headers, serial="MIRO-1"):
+    """Registers a robot through the API for the user in `headers` and returns its id."""
+    return client.post("/robots/", json={"serial_number": serial, "name": "Robot"}, headers=headers).json()["id"]
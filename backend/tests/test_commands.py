@@ -0,0 +1,40 @@
+import pytest
+
+from backend import wire
+from backend.routers import robots
+
+from .conftest import login, register_robot
+
+
+@pytest.fixture(autouse=True)
+def fresh_commands(monkeypatch):
+    # Commands are kept per robot id in module state, and every test database starts at id 1
+    for name in ("latest_commands", "latest_command_frames", "command_seq"):
+        monkeypatch.setattr(robots, name, {})
+
+
+def test_out_of_range_command_is_rejected(client):
+    headers = login(client)
+    robot_id = register_robot(client, headers)
+
+    for body in ({"linear_x": 1e39, "angular_z": 0.0}, {"linear_x": 0.0, "angular_z": -1e39}):
+        resp = client.post(f"/robots/{robot_id}/command", json=body, headers=headers)
+        assert resp.status_code == 422
+
+    # The rejected commands never replaced the default stop
+    resp = client.get(f"/robots/{robot_id}/command", headers={"Accept": wire.COMMAND_MEDIA_TYPE})
+    assert resp.content == wire.STOP_COMMAND
+
+
+def test_command_round_trips_through_binary_encoding(client):
+    headers = login(client)
+    robot_id = register_robot(client, headers)
+
+    resp = client.post(f"/robots/{robot_id}/command", json={"linear_x": 0.5, "angular_z": -1.0}, headers=headers)
+    assert resp.status_code == 200
+
+    resp = client.get(f"/robots/{robot_id}/command", headers={"Accept": wire.COMMAND_MEDIA_TYPE})
+    assert resp.headers["content-type"] == wire.COMMAND_MEDIA_TYPE
+    assert len(resp.content) == wire.COMMAND_FORMAT.size == 20
+    seq, _, linear_x, angular_z = wire.decode_command(resp.content)
+    assert (seq, linear_x, angular_z) == (1, 0.5, -1.0)
@@ -0,0 +1,226 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy import create_engine
+
+from backend import database, dispatch, models, notifiers
+
+from .conftest import login, make_user
+
+
+def add_contacts(db, user, count):
+    for i in range(count):
+        db.add(models.EmergencyContact(name=f"Contact {i}", phone_number=f"+1555000{i}", relation="family", user_id=user.id))
+    db.commit()
+
+
+def run_until_idle(dispatcher, passes=20):
+    for _ in range(passes):
+        if not asyncio.run(dispatcher.run_once()):
+            return
+
+
+def alert_state(db, alert_id):
+    db.expire_all()
+    alert = db.get(models.EmergencyAlert, alert_id)
+    return alert.status, sorted((d.status, d.attempts) for d in alert.deliveries)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(dispatch, "RETRY_BASE_DELAY", 0)
+
+
+def test_fans_out_to_every_contact(db):
+    user = make_user(db)
+    add_contacts(db, user, 3)
+    notifier = notifiers.FakeNotifier()
+    dispatcher = dispatch.EmergencyDispatcher(notifier=notifier)
+
+    alert, deduplicated = dispatcher.enqueue(db, user.id)
+    assert not deduplicated
+    run_until_idle(dispatcher)
+
+    assert sorted(job["contact_name"] for job in notifier.sent) == ["Contact 0", "Contact 1", "Contact 2"]
+    assert alert_state(db, alert.id) == ("completed", [("sent", 1)] * 3)
+
+
+def test_retries_then_succeeds(db):
+    user = make_user(db)
+    add_contacts(db, user, 2)
+    dispatcher = dispatch.EmergencyDispatcher(notifier=notifiers.FakeNotifier(fail_times=2))
+
+    alert, _ = dispatcher.enqueue(db, user.id)
+    run_until_idle(dispatcher)
+
+    assert alert_state(db, alert.id) == ("completed", [("sent", 3)] * 2)
+
+
+def test_gives_up_after_max_attempts(db):
+    user = make_user(db)
+    add_contacts(db, user, 1)
+    dispatcher = dispatch.EmergencyDispatcher(notifier=notifiers.FakeNotifier(fail_times=dispatch.MAX_ATTEMPTS))
+
+    alert, _ = dispatcher.enqueue(db, user.id)
+    run_until_idle(dispatcher)
+
+    assert alert_state(db, alert.id) == ("failed", [("failed", dispatch.MAX_ATTEMPTS)])
+    db.expire_all()
+    assert "fake failure" in db.get(models.EmergencyAlert, alert.id).deliveries[0].last_error
+
+
+def test_backoff_schedules_retry_in_the_future(db, monkeypatch):
+    monkeypatch.setattr(dispatch, "RETRY_BASE_DELAY", 60)
+    user = make_user(db)
+    add_contacts(db, user, 1)
+    dispatcher = dispatch.EmergencyDispatcher(notifier=notifiers.FakeNotifier(fail_times=1))
+
+    alert, _ = dispatcher.enqueue(db, user.id)
+    run_until_idle(dispatcher)
+
+    db.expire_all()
+    delivery = db.get(models.EmergencyAlert, alert.id).deliveries[0]
+    assert (delivery.status, delivery.attempts) == ("pending", 1)
+    assert delivery.next_attempt_at > datetime.utcnow() + timedelta(seconds=50)
+
+
+def test_repeated_trigger_is_deduplicated_while_open(db):
+    user = make_user(db)
+    add_contacts(db, user, 1)
+    dispatcher = dispatch.EmergencyDispatcher(notifier=notifiers.FakeNotifier())
+
+    first, _ = dispatcher.enqueue(db, user.id)
+    second, deduplicated = dispatcher.enqueue(db, user.id)
+    assert deduplicated and second.id == first.id
+
+
+def test_concurrent_triggers_create_one_alert(db):
+    user = make_user(db)
+    add_contacts(db, user, 1)
+    dispatcher = dispatch.EmergencyDispatcher(notifier=notifiers.FakeNotifier())
+    barrier = threading.Barrier(8)
+    results = []
+
+    def trigger():
+        # Each request has its own session, as with get_db
+        session = database.SessionLocal()
+        try:
+            barrier.wait()
+            alert, deduplicated = dispatcher.enqueue(session, user.id)
+            results.append((alert.id, deduplicated))
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=trigger) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({alert_id for alert_id, _ in results}) == 1
+    assert sorted(deduplicated for _, deduplicated in results) == [False] + [True] * 7
+    assert db.query(models.EmergencyAlert).count() == 1
+
+
+def test_trigger_after_delivered_alert_is_not_deduplicated(db):
+    user = make_user(db)
+    add_contacts(db, user, 1)
+    dispatcher = dispatch.EmergencyDispatcher(notifier=notifiers.FakeNotifier())
+
+    first, _ = dispatcher.enqueue(db, user.id)
+    run_until_idle(dispatcher)
+    second, deduplicated = dispatcher.enqueue(db, user.id)
+    assert not deduplicated and second.id != first.id
+
+
+def test_recover_requeues_in_flight_deliveries(db):
+    user = make_user(db)
+    add_contacts(db, user, 2)
+    notifier = notifiers.FakeNotifier()
+    dispatcher = dispatch.EmergencyDispatcher(notifier=notifier)
+
+    alert, _ = dispatcher.enqueue(db, user.id)
+    dispatcher._expand_queued_alerts()
+    # Simulate a crash after claiming: rows stuck in "sending"
+    assert len(dispatcher._claim_due()) == 2
+    assert dispatcher._claim_due() == []
+
+    dispatcher._recover()
+    run_until_idle(dispatcher)
+    assert len(notifier.sent) == 2
+    assert alert_state(db, alert.id)[0] == "completed"
+
+
+def test_delivery_is_retried_when_recording_results_fails(db, monkeypatch):
+    monkeypatch.setattr(dispatch, "CLAIM_LEASE", timedelta(0))
+    user = make_user(db)
+    add_contacts(db, user, 1)
+    notifier = notifiers.FakeNotifier()
+    dispatcher = dispatch.EmergencyDispatcher(notifier=notifier)
+    record_results = dispatcher._record_results
+    calls = []
+
+    def flaky_record_results(results):
+        calls.append(results)
+        if len(calls) == 1:
+            raise sa.exc.OperationalError("UPDATE", {}, Exception("database is locked"))
+        record_results(results)
+
+    monkeypatch.setattr(dispatcher, "_record_results", flaky_record_results)
+
+    alert, _ = dispatcher.enqueue(db, user.id)
+    with pytest.raises(sa.exc.OperationalError):
+        asyncio.run(dispatcher.run_once())
+    assert alert_state(db, alert.id) == ("dispatching", [("sending", 1)])
+
+    # The expired claim is picked up again without a restart
+    run_until_idle(dispatcher)
+    assert len(notifier.sent) == 2
+    assert alert_state(db, alert.id) == ("completed", [("sent", 2)])
+
+
+def test_unexpired_claim_is_not_taken_again(db):
+    user = make_user(db)
+    add_contacts(db, user, 1)
+    dispatcher = dispatch.EmergencyDispatcher(notifier=notifiers.FakeNotifier())
+
+    dispatcher.enqueue(db, user.id)
+    dispatcher._expand_queued_alerts()
+    assert len(dispatcher._claim_due()) == 1
+    assert dispatcher._claim_due() == []
+
+
+def test_alert_status_endpoint(client):
+    headers = login(client)
+    client.post("/emergency/", json={"name": "Mum", "phone_number": "+15550001", "relation": "mother"}, headers=headers)
+
+    resp = client.post("/emergency/trigger", headers=headers)
+    assert resp.status_code == 200
+    alert_id = resp.json()["alert_id"]
+
+    run_until_idle(dispatch.EmergencyDispatcher(notifier=notifiers.FakeNotifier()))
+
+    resp = client.get(f"/emergency/alerts/{alert_id}", headers=headers)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["status"] == "completed"
+    assert [(d["status"], d["attempts"]) for d in body["deliveries"]] == [("sent", 1)]
+
+    # Other users can't see it
+    other = login(client, email="other@example.com")
+    assert client.get(f"/emergency/alerts/{alert_id}", headers=other).status_code == 404
+
+
+def test_alert_migration_skips_existing_tables(tmp_path):
+    # A database the app built with create_all, alert tables included
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    database.run_migrations(engine)
+
+    inspector = sa.inspect(engine)
+    assert inspector.has_table("alembic_version")
+    assert inspector.has_table("emergency_alerts") and inspector.has_table("alert_deliveries")
+    assert "ix_alert_deliveries_due" in {index["name"] for index in inspector.get_indexes("alert_deliveries")}
@@ -0,0 +1,109 @@
+import pytest
+
+from backend import liveness, models
+
+from .conftest import make_robot, make_user
+
+
+def stored_state(db, robot_id):
+    db.expire_all()
+    return db.get(models.Robot, robot_id).is_online
+
+
+def test_flush_writes_only_transitions(db):
+    owner = make_user(db)
+    robot = make_robot(db, owner)
+    tracker = liveness.LivenessTracker(timeout=30)
+
+    assert tracker.unknown_ids(db, [robot.id]) == []
+    tracker.record(robot.id, True, now=100.0)
+    assert tracker.flush(now=101.0) == 1
+    assert stored_state(db, robot.id) is True
+
+    # Further heartbeats with the same state don't touch the database
+    tracker.record(robot.id, True, now=110.0)
+    assert tracker.flush(now=111.0) == 0
+
+
+def test_missed_heartbeats_mark_robot_offline(db):
+    owner = make_user(db)
+    robot = make_robot(db, owner)
+    tracker = liveness.LivenessTracker(timeout=30)
+    tracker.unknown_ids(db, [robot.id])
+
+    tracker.record(robot.id, True, now=100.0)
+    tracker.flush(now=100.0)
+    assert tracker.is_online(robot.id, now=129.0)
+    assert not tracker.is_online(robot.id, now=131.0)
+
+    assert tracker.flush(now=131.0) == 1
+    assert stored_state(db, robot.id) is False
+
+
+def test_unknown_ids_reports_missing_robots(db):
+    owner = make_user(db)
+    robot = make_robot(db, owner)
+    tracker = liveness.LivenessTracker()
+    assert tracker.unknown_ids(db, [robot.id, 999]) == [999]
+
+
+def test_load_online_robots_expires_stale_state(db):
+    owner = make_user(db)
+    robot = make_robot(db, owner, is_online=True)
+    tracker = liveness.LivenessTracker(timeout=30)
+
+    # Left "online" by a crashed bridge; gets a grace period, then goes offline
+    tracker.load_online_robots(now=100.0)
+    assert tracker.is_online(robot.id, now=129.0)
+    assert tracker.flush(now=129.0) == 0
+    assert tracker.flush(now=131.0) == 1
+    assert stored_state(db, robot.id) is False
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    # The module tracker caches known robot ids, which differ per test database
+    instance = liveness.LivenessTracker(timeout=30)
+    monkeypatch.setattr(liveness, "tracker", instance)
+    return instance
+
+
+def test_bulk_status_reports_unknown_robots(client, db, tracker):
+    owner = make_user(db)
+    first = make_robot(db, owner, serial="MIRO-1")
+    second = make_robot(db, owner, serial="MIRO-2")
+
+    resp = client.post("/robots/status", json={"statuses": [
+        {"robot_id": first.id, "is_online": True},
+        {"robot_id": 999, "is_online": True},
+        {"robot_id": second.id, "is_online": False},
+    ]})
+    assert resp.status_code == 200
+    assert resp.json() == {"status": "updated", "updated": 2, "unknown": [999]}
+    assert tracker.is_online(first.id) and not tracker.is_online(second.id)
+    assert tracker.is_online(999) is False
+
+
+def test_bulk_status_counts_duplicate_ids_once(client, db, tracker):
+    owner = make_user(db)
+    robot = make_robot(db, owner)
+
+    resp = client.post("/robots/status", json={"statuses": [
+        {"robot_id": robot.id, "is_online": True},
+        {"robot_id": robot.id, "is_online": False},
+        {"robot_id": 999, "is_online": True},
+        {"robot_id": 999, "is_online": True},
+    ]})
+    assert resp.json() == {"status": "updated", "updated": 1, "unknown": [999]}
+    # The last status listed for a robot wins
+    assert not tracker.is_online(robot.id)
+
+
+def test_single_status_returns_404_for_unknown_robot(client, db, tracker):
+    owner = make_user(db)
+    robot = make_robot(db, owner)
+
+    assert client.post("/robots/999/status?is_online=true").status_code == 404
+    resp = client.post(f"/robots/{robot.id}/status?is_online=true")
+    assert resp.status_code == 200
+    assert tracker.is_online(robot.id)
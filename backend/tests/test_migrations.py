@@ -0,0 +1,39 @@
+import sqlalchemy as sa
+from sqlalchemy import create_engine
+
+from backend import database, models
+
+
+def index_names(engine, table):
+    return {index["name"] for index in sa.inspect(engine).get_indexes(table)}
+
+
+def test_upgrade_fresh_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    database.run_migrations(engine)
+    assert "ix_robots_owner_id" in index_names(engine, "robots")
+    assert "ix_emergency_contacts_user_id" in index_names(engine, "emergency_contacts")
+
+
+BASELINE_TABLES = [models.User.__table__, models.Robot.__table__, models.EmergencyContact.__table__]
+
+
+def test_upgrade_database_created_by_create_all(tmp_path):
+    # The app used to build its schema (including the new indexes) with create_all
+    # and no alembic_version table
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    models.Base.metadata.create_all(bind=engine, tables=BASELINE_TABLES)
+    database.run_migrations(engine)
+    database.run_migrations(engine)
+    assert "ix_robots_owner_id" in index_names(engine, "robots")
+
+
+def test_upgrade_baseline_database_adds_indexes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    models.Base.metadata.create_all(bind=engine, tables=BASELINE_TABLES)
+    with engine.begin() as conn:
+        conn.execute(sa.text("DROP INDEX ix_robots_owner_id"))
+        conn.execute(sa.text("DROP INDEX ix_emergency_contacts_user_id"))
+    database.run_migrations(engine)
+    assert "ix_robots_owner_id" in index_names(engine, "robots")
+    assert "ix_emergency_contacts_user_id" in index_names(engine, "emergency_contacts")
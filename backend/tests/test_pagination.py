@@ -0,0 +1,63 @@
+from .conftest import login, register_robot
+
+
+def walk(client, path, headers, limit):
+    """Follows X-Next-Cursor until the last page; returns the pages."""
+    pages, params = [], {"limit": limit}
+    while True:
+        resp = client.get(path, params=params, headers=headers)
+        assert resp.status_code == 200
+        pages.append(resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+        assert int(cursor) == pages[-1][-1]["id"]
+        params = {"limit": limit, "after_id": cursor}
+
+
+def test_robot_listing_pages_with_cursor(client):
+    headers = login(client)
+    other = login(client, email="other@example.com")
+    ids = [register_robot(client, headers, serial=f"MIRO-{i}") for i in range(5)]
+    register_robot(client, other, serial="OTHER-1")
+
+    pages = walk(client, "/robots/", headers, limit=2)
+    assert [[robot["id"] for robot in page] for page in pages] == [ids[0:2], ids[2:4], ids[4:]]
+    # Projected rows serialize like full robots
+    assert pages[0][0] == {"serial_number": "MIRO-0", "name": "Robot", "model_type": "MiRo-e",
+                           "id": ids[0], "is_online": False, "owner_id": pages[0][0]["owner_id"]}
+
+
+def test_robot_listing_exact_page_has_no_cursor(client):
+    headers = login(client)
+    for i in range(2):
+        register_robot(client, headers, serial=f"MIRO-{i}")
+
+    resp = client.get("/robots/", params={"limit": 2}, headers=headers)
+    assert len(resp.json()) == 2
+    assert "X-Next-Cursor" not in resp.headers
+
+
+def test_robot_listing_still_accepts_skip(client):
+    headers = login(client)
+    ids = [register_robot(client, headers, serial=f"MIRO-{i}") for i in range(3)]
+
+    resp = client.get("/robots/", params={"skip": 1}, headers=headers)
+    assert [robot["id"] for robot in resp.json()] == ids[1:]
+
+
+def test_contact_listing_pages_with_cursor(client):
+    headers = login(client)
+    other = login(client, email="other@example.com")
+    client.post("/emergency/", json={"name": "Stranger", "phone_number": "+15559999", "relation": "none"}, headers=other)
+    ids = [
+        client.post("/emergency/", json={"name": f"Contact {i}", "phone_number": f"+1555000{i}", "relation": "family"},
+                    headers=headers).json()["id"]
+        for i in range(5)
+    ]
+
+    pages = walk(client, "/emergency/", headers, limit=2)
+    assert [[contact["id"] for contact in page] for page in pages] == [ids[0:2], ids[2:4], ids[4:]]
+    contact = pages[0][0]
+    assert (contact["name"], contact["phone_number"], contact["relation"]) == ("Contact 0", "+15550000", "family")
+    assert contact["user_id"] == pages[-1][0]["user_id"]
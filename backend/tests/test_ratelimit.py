@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from backend import ratelimit
+from backend.main import app
+
+from .conftest import login
+
+
+def test_bucket_allows_burst_then_refills():
+    store = ratelimit.InMemoryRateLimitStore()
+    limit = ratelimit.RateLimit(rate=2, burst=3)
+
+    assert [store.take_sync("k", limit, now=0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert store.take_sync("k", limit, now=0.0) == 0.5
+    # Half a second refills one token at 2/s
+    assert store.take_sync("k", limit, now=0.5) == 0.0
+    assert store.take_sync("k", limit, now=0.5) > 0
+    # Never refills past the burst size
+    assert [store.take_sync("k", limit, now=100.0) for _ in range(4)][-1] > 0
+
+
+def test_buckets_are_independent_per_key():
+    store = ratelimit.InMemoryRateLimitStore()
+    limit = ratelimit.RateLimit(rate=1, burst=1)
+    assert asyncio.run(store.take("a", limit)) == 0.0
+    assert asyncio.run(store.take("b", limit)) == 0.0
+    assert asyncio.run(store.take("a", limit)) > 0
+
+
+def frame_app(max_frame_bytes):
+    async def upload(request):
+        body = await request.body()
+        return JSONResponse({"size": len(body)})
+
+    return Starlette(
+        routes=[Route("/robots/{robot_id}/camera", upload, methods=["POST"])],
+        middleware=[Middleware(ratelimit.RateLimitMiddleware, store=ratelimit.InMemoryRateLimitStore(), max_frame_bytes=max_frame_bytes)],
+    )
+
+
+def test_oversized_frame_rejected_from_content_length():
+    client = TestClient(frame_app(max_frame_bytes=10))
+    assert client.post("/robots/1/camera", content=b"x" * 10).json() == {"size": 10}
+    assert client.post("/robots/1/camera", content=b"x" * 11).status_code == 413
+
+
+def test_oversized_chunked_frame_rejected_while_streaming():
+    client = TestClient(frame_app(max_frame_bytes=10))
+
+    def chunks():
+        for _ in range(4):
+            yield b"xxxx"
+
+    resp = client.post("/robots/1/camera", content=chunks())
+    assert resp.status_code == 413
+
+
+@pytest.fixture
+def api_client(db_engine, monkeypatch):
+    # Starlette builds the middleware stack on first request; dropping it gives
+    # this test its own RateLimitMiddleware, with a frozen clock so buckets don't refill
+    monkeypatch.setattr(ratelimit, "get_store", lambda: ratelimit.InMemoryRateLimitStore(clock=lambda: 0.0))
+    app.middleware_stack = None
+    yield TestClient(app)
+    app.middleware_stack = None
+
+
+def test_rate_limited_response_has_retry_after(api_client):
+    client = api_client
+    headers = login(client)
+    statuses = [client.post("/robots/1/command", json={"linear_x": 0, "angular_z": 0}, headers=headers).status_code for _ in range(45)]
+    assert statuses.count(429) > 0
+    resp = client.post("/robots/1/command", json={"linear_x": 0, "angular_z": 0}, headers=headers)
+    assert resp.status_code == 429
+    assert int(resp.headers["retry-after"]) >= 1
+
+
+def test_unauthenticated_requests_cannot_lock_out_the_owner(api_client):
+    client = api_client
+    headers = login(client)
+    for _ in range(45):
+        assert client.post("/robots/5/command", json={"linear_x": 0, "angular_z": 0}).status_code in (401, 429)
+    resp = client.post("/robots/5/command", json={"linear_x": 0, "angular_z": 0}, headers=headers)
+    assert resp.status_code == 200
+
+
+def test_other_clients_cannot_lock_out_the_camera_bridge(db_engine, monkeypatch):
+    store = ratelimit.InMemoryRateLimitStore(clock=lambda: 0.0)
+    monkeypatch.setattr(ratelimit, "get_store", lambda: store)
+    app.middleware_stack = None
+    try:
+        attacker = TestClient(app, client=("203.0.113.7", 40000))
+        bridge = TestClient(app, client=("192.0.2.10", 40000))
+        frame = {"file": ("frame.jpg", b"jpeg", "image/jpeg")}
+
+        statuses = [attacker.post("/robots/5/camera", files=frame).status_code for _ in range(45)]
+        assert statuses[-1] == 429
+        assert bridge.post("/robots/5/camera", files=frame).status_code == 200
+    finally:
+        app.middleware_stack = None
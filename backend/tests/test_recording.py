@@ -0,0 +1,124 @@
+import os
+import time
+
+import pytest
+
+from backend import recording
+from backend.routers import robots
+
+from .conftest import login, register_robot
+
+
+def record(recorder, robot_id, count, t0, step=1.0, size=12):
+    recorder.start(robot_id)
+    for i in range(count):
+        recorder.submit(robot_id, b"F%02d" % i + b"x" * (size - 3), t0 + i * step)
+    recorder.shutdown()
+
+
+def test_rotates_segments_and_seeks(tmp_path):
+    recorder = recording.FrameRecorder(str(tmp_path), segment_max_bytes=50)
+    t0 = time.time()
+    record(recorder, 1, 10, t0)
+
+    segments = recorder.segments(1)
+    assert [s["frames"] for s in segments] == [4, 4, 2]
+    assert sum(s["bytes"] for s in segments) == 120
+
+    # Range spans a segment boundary
+    entries = recorder.seek(1, int((t0 + 2) * 1000), int((t0 + 6) * 1000))
+    frames = list(recorder.read_frames(1, entries))
+    assert [frame[:3] for _, frame in frames] == [b"F02", b"F03", b"F04", b"F05", b"F06"]
+
+
+def test_frame_at_returns_last_frame_before(tmp_path):
+    recorder = recording.FrameRecorder(str(tmp_path), segment_max_bytes=50)
+    t0 = time.time()
+    record(recorder, 1, 10, t0)
+
+    timestamp_ms, frame = recorder.frame_at(1, int((t0 + 4.5) * 1000))
+    assert frame[:3] == b"F04" and timestamp_ms == int((t0 + 4) * 1000)
+    assert recorder.frame_at(1, int((t0 - 1) * 1000)) is None
+
+
+def test_size_retention_applies_when_recording_stops(tmp_path):
+    recorder = recording.FrameRecorder(str(tmp_path), segment_max_bytes=50, retention_max_bytes=60)
+    recorder.start(1)
+    t0 = time.time()
+    for i in range(8):
+        recorder.submit(1, b"x" * 12, t0 + i)
+    recorder.stop(1)
+    recorder.shutdown()
+
+    # Two closed segments of 48 bytes; only the newest fits in 60
+    assert [s["frames"] for s in recorder.segments(1)] == [4]
+
+
+def test_age_retention_prunes_robots_that_stopped_recording(tmp_path):
+    recorder = recording.FrameRecorder(str(tmp_path), retention_max_seconds=3600)
+    record(recorder, 1, 3, time.time() - 7200)
+    record(recorder, 2, 3, time.time())
+
+    recorder.apply_retention_all()
+    assert recorder.segments(1) == []
+    assert len(recorder.segments(2)) == 1
+
+
+def test_writer_thread_applies_retention_periodically(tmp_path):
+    recorder = recording.FrameRecorder(str(tmp_path), retention_max_seconds=3600, retention_interval=0.05)
+    record(recorder, 1, 3, time.time() - 7200)
+    assert os.listdir(tmp_path / "1")
+
+    recorder.start_writer()
+    deadline = time.time() + 5
+    while recorder.segments(1) and time.time() < deadline:
+        time.sleep(0.05)
+    recorder.shutdown()
+    assert recorder.segments(1) == []
+
+
+@pytest.fixture
+def recorder(tmp_path, monkeypatch):
+    instance = recording.FrameRecorder(str(tmp_path))
+    monkeypatch.setattr(recording, "recorder", instance)
+    yield instance
+    instance.shutdown()
+
+
+def test_recording_endpoints_require_owner(client, recorder):
+    owner = login(client)
+    other = login(client, email="other@example.com")
+    robot_id = register_robot(client, owner)
+    now = time.time()
+
+    assert client.post(f"/robots/{robot_id}/recording").status_code == 401
+    assert client.post(f"/robots/{robot_id}/recording", headers=other).status_code == 404
+    for path in ("", f"/frames?start={now}&end={now}", f"/frame?at={now}", f"/playback?start={now}&end={now}"):
+        assert client.get(f"/robots/{robot_id}/recording{path}").status_code == 401
+        assert client.get(f"/robots/{robot_id}/recording{path}", headers=other).status_code == 404
+
+    assert client.post(f"/robots/{robot_id}/recording", headers=owner).status_code == 200
+    assert recorder.is_recording(robot_id)
+
+
+def test_playback_caps_sleep_between_frames(client, recorder, monkeypatch):
+    headers = login(client)
+    robot_id = register_robot(client, headers)
+    t0 = time.time()
+    recorder.start(robot_id)
+    recorder.submit(robot_id, b"first", t0)
+    recorder.submit(robot_id, b"second", t0 + 3 * 3600)  # recording restarted hours later
+    recorder.shutdown()
+
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(robots.asyncio, "sleep", fake_sleep)
+    # Blocking a threadpool worker between frames would starve the sync routes
+    monkeypatch.setattr(robots.time, "sleep", lambda seconds: pytest.fail("playback slept in a worker thread"))
+    resp = client.get(f"/robots/{robot_id}/recording/playback?start={t0 - 1}&end={t0 + 4 * 3600}", headers=headers)
+    assert resp.status_code == 200
+    assert b"first" in resp.content and b"second" in resp.content
+    assert sleeps == [robots.PLAYBACK_MAX_SLEEP]
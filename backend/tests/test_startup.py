@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+import sqlalchemy as sa
+from fastapi.testclient import TestClient
+
+from backend import database
+from backend.main import app
+
+
+def test_lifespan_migrates_the_database(tmp_path, monkeypatch):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'app.db'}", connect_args={"check_same_thread": False})
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(database, "SessionLocal", sa.orm.sessionmaker(bind=engine))
+
+    with TestClient(app) as client:
+        assert client.get("/health").status_code == 200
+
+    with engine.connect() as conn:
+        version = conn.execute(sa.text("SELECT version_num FROM alembic_version")).scalar()
+    assert version is not None
+    assert "ix_robots_owner_id" in {i["name"] for i in sa.inspect(engine).get_indexes("robots")}
+
+
+def test_importing_the_app_does_not_load_pillow():
+    # A fresh interpreter, since other tests may have rendered the placeholder already
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    code = "import sys, backend.main; assert 'PIL' not in sys.modules"
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
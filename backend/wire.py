@@ -0,0 +1,28 @@
+import struct
+from typing import Optional, Tuple
+
+# Compact binary encoding of robot commands for bridges that poll
+# GET /robots/{id}/command many times a second. JSON stays the default for the app.
+COMMAND_MEDIA_TYPE = "application/x-robot-command"
+
+# seq (uint32), timestamp (float64, epoch seconds), linear_x (float32), angular_z (float32)
+COMMAND_FORMAT = struct.Struct("<Idff")
+
+
+def encode_command(seq: int, timestamp: float, linear_x: float, angular_z: float) -> bytes:
+    return COMMAND_FORMAT.pack(seq & 0xFFFFFFFF, timestamp, linear_x, angular_z)
+
+
+def decode_command(data: bytes) -> Tuple[int, float, float, float]:
+    return COMMAND_FORMAT.unpack(data)
+
+
+def wants_binary(accept: Optional[str]) -> bool:
+    """True if the Accept header asks for the binary command encoding."""
+    if not accept:
+        return False
+    return any(part.split(";")[0].strip() == COMMAND_MEDIA_TYPE for part in accept.split(","))
+
+
+# Sent before any command has been issued: stop
+STOP_COMMAND = encode_command(0, 0.0, 0.0, 0.0)
@@ -10,7 +10,7 @@ echo "🚀 Deploying backend to $REMOTE_IP..."
 # 1. Upload the backend code
 echo "📦 Uploading files..."
 # We exclude __pycache__ and venv to save time and bandwidth
-rsync -avz --exclude '__pycache__' --exclude 'venv' --exclude '*.db' ./backend/ $REMOTE_USER@$REMOTE_IP:~/backend/
+rsync -avz --exclude '__pycache__' --exclude 'venv' --exclude '*.db' --exclude 'recordings' ./backend/ $REMOTE_USER@$REMOTE_IP:~/backend/
 
 # 2. Restart the server
 # Adjust the restart command based on how you are running it (systemd, docker, or simple nohup)
@@ -0,0 +1,71 @@
+"""Micro-benchmark of bridge frame encoders at 320x240 and 640x480.
+
+    python bench_encoders.py [--frames 200]
+
+Encoders that aren't installed (e.g. PyTurboJPEG) are skipped.
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+import frame_encoders
+
+SIZES = [(320, 240), (640, 480)]
+
+def make_frame(width, height):
+    """A camera-like test frame: smooth gradient, a few shapes and some sensor noise."""
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    frame = np.dstack([np.broadcast_to(x, (height, width)), np.broadcast_to(y, (height, width)), (x + y) / 2])
+    frame = frame.astype(np.uint8)
+    cv2.circle(frame, (width // 3, height // 2), height // 6, (0, 215, 255), -1)
+    cv2.rectangle(frame, (width // 2, height // 4), (width * 3 // 4, height // 2), (0, 0, 255), -1)
+    cv2.putText(frame, "SIMULATION FEED", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+    noise = np.random.default_rng(0).integers(0, 12, frame.shape, dtype=np.uint8)
+    return cv2.add(frame, noise)
+
+def bench(fn, frames):
+    fn()  # warm up (buffer allocation, library init)
+    start = time.perf_counter()
+    for _ in range(frames):
+        result = fn()
+    return (time.perf_counter() - start) / frames * 1000, result
+
+def bench_encoders(frames):
+    print("Encoders (ms/frame, bytes/frame):")
+    for width, height in SIZES:
+        frame = make_frame(width, height)
+        for preset in frame_encoders.PRESETS:
+            for name in frame_encoders.ENCODERS:
+                try:
+                    encoder = frame_encoders.create_encoder(name, preset)
+                except (ImportError, OSError, RuntimeError) as e:
+                    print(f"  {width}x{height} {preset:<8} {name:<7} skipped ({e.__class__.__name__})")
+                    continue
+                ms, jpeg = bench(lambda: encoder.encode(frame), frames)
+                print(f"  {width}x{height} {preset:<8} {name:<7} {ms:7.3f} ms  {len(jpeg):7d} B")
+
+        # Baseline: what the bridge used to do on every frame
+        ms, jpeg = bench(lambda: cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), 50])[1].tobytes(), frames)
+        print(f"  {width}x{height} {'(old)':<8} {'imencode':<7} {ms:7.3f} ms  {len(jpeg):7d} B")
+
+def bench_resize(frames):
+    print("\nResize 640x480 -> 320x240 (ms/frame):")
+    frame = make_frame(640, 480)
+    ms, _ = bench(lambda: cv2.resize(frame, (320, 240)), frames)
+    print(f"  new array per frame  {ms:7.3f} ms")
+    resizer = frame_encoders.FrameResizer(320, 240)
+    ms, _ = bench(lambda: resizer.resize(frame), frames)
+    print(f"  reused buffer        {ms:7.3f} ms")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=200, help="Frames per measurement")
+    args = parser.parse_args()
+    bench_encoders(args.frames)
+    bench_resize(args.frames)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""JPEG encoders for bridge frame uploads.
+
+The bridge spends most of its CPU time encoding frames, so the encoder is
+pluggable: libjpeg-turbo through PyTurboJPEG when it is installed (encoding
+into a reused output buffer), otherwise OpenCV with its parameters built once.
+"""
+import inspect
+
+# Quality presets: name -> (JPEG quality, chroma subsampling)
+PRESETS = {
+    "low": (40, "420"),
+    "default": (50, "420"),
+    "high": (75, "422"),
+    "best": (90, "444"),
+}
+
+def _padded(value, block=16):
+    return (value + block - 1) // block * block
+
+class FrameEncoder:
+    """Base class. `encode` returns a bytes-like JPEG, valid until the next call."""
+
+    name = "base"
+
+    def __init__(self, quality=50, subsampling="420"):
+        self.quality = quality
+        self.subsampling = subsampling
+
+    def encode(self, frame):
+        raise NotImplementedError
+
+class OpenCVEncoder(FrameEncoder):
+    name = "opencv"
+
+    def __init__(self, quality=50, subsampling="420"):
+        super().__init__(quality, subsampling)
+        import cv2
+
+        self._cv2 = cv2
+        self._params = [int(cv2.IMWRITE_JPEG_QUALITY), quality]
+        # Explicit subsampling needs OpenCV >= 4.5.5; older builds always use 4:2:0
+        factor = getattr(cv2, f"IMWRITE_JPEG_SAMPLING_FACTOR_{subsampling}", None)
+        if factor is not None:
+            self._params += [int(cv2.IMWRITE_JPEG_SAMPLING_FACTOR), int(factor)]
+
+    def encode(self, frame):
+        ok, buf = self._cv2.imencode('.jpg', frame, self._params)
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        return buf.data
+
+class TurboJpegEncoder(FrameEncoder):
+    """libjpeg-turbo encoder that writes every frame into one preallocated buffer."""
+
+    name = "turbo"
+
+    def __init__(self, quality=50, subsampling="420", lib_path=None):
+        super().__init__(quality, subsampling)
+        import turbojpeg
+
+        self._jpeg = turbojpeg.TurboJPEG(lib_path)
+        self._subsample = {
+            "444": turbojpeg.TJSAMP_444,
+            "422": turbojpeg.TJSAMP_422,
+            "420": turbojpeg.TJSAMP_420,
+            "gray": turbojpeg.TJSAMP_GRAY,
+        }[subsampling]
+        self._buffer = None
+        # PyTurboJPEG < 1.7 has no dst argument; those versions allocate per frame
+        try:
+            self._supports_dst = "dst" in inspect.signature(self._jpeg.encode).parameters
+        except (TypeError, ValueError):
+            self._supports_dst = False
+
+    def _ensure_buffer(self, frame):
+        # Worst case from tjBufSize(): 4:4:4 MCUs, 6 bytes per padded pixel plus headers
+        height, width = frame.shape[:2]
+        size = _padded(width) * _padded(height) * 6 + 2048
+        if self._buffer is None or len(self._buffer) < size:
+            self._buffer = bytearray(size)
+        return self._buffer
+
+    def encode(self, frame):
+        if self._supports_dst:
+            buffer = self._ensure_buffer(frame)
+            _, size = self._jpeg.encode(frame, quality=self.quality, jpeg_subsample=self._subsample, dst=buffer)
+            return memoryview(buffer)[:size]
+        return self._jpeg.encode(frame, quality=self.quality, jpeg_subsample=self._subsample)
+
+ENCODERS = {
+    "opencv": OpenCVEncoder,
+    "turbo": TurboJpegEncoder,
+}
+
+def create_encoder(name="auto", preset="default"):
+    """Builds an encoder by name. "auto" prefers libjpeg-turbo and falls back to OpenCV."""
+    quality, subsampling = PRESETS[preset]
+    if name == "auto":
+        try:
+            return TurboJpegEncoder(quality, subsampling)
+        except (ImportError, OSError, RuntimeError):
+            # PyTurboJPEG missing, or installed without the libjpeg-turbo shared library
+            return OpenCVEncoder(quality, subsampling)
+    return ENCODERS[name](quality, subsampling)
+
+class FrameResizer:
+    """Resizes frames into one reused output array instead of allocating per frame."""
+
+    def __init__(self, width, height):
+        self.size = (width, height)
+        self._buffer = None
+
+    def resize(self, frame):
+        import cv2
+        import numpy as np
+
+        width, height = self.size
+        shape = (height, width) + frame.shape[2:]
+        if self._buffer is None or self._buffer.shape != shape or self._buffer.dtype != frame.dtype:
+            self._buffer = np.empty(shape, dtype=frame.dtype)
+        cv2.resize(frame, self.size, dst=self._buffer)
+        return self._buffer
@@ -0,0 +1,117 @@
+import sys
+import types
+
+import pytest
+
+import frame_encoders
+
+
+def fake_turbojpeg(monkeypatch, with_dst=True, fail=None):
+    """Installs a stand-in PyTurboJPEG module; records the dst buffers it is given."""
+    module = types.ModuleType("turbojpeg")
+    module.TJSAMP_444, module.TJSAMP_422, module.TJSAMP_420, module.TJSAMP_GRAY = range(4)
+    module.calls = []
+
+    class TurboJPEG:
+        def __init__(self, lib_path=None):
+            if fail is not None:
+                raise fail
+
+        if with_dst:
+            def encode(self, img_array, quality=85, jpeg_subsample=1, dst=None):
+                module.calls.append(dst)
+                if dst is None:
+                    return b"JPEG"
+                dst[:4] = b"JPEG"
+                return dst, 4
+        else:
+            def encode(self, img_array, quality=85, jpeg_subsample=1):
+                module.calls.append(None)
+                return b"JPEG"
+
+    module.TurboJPEG = TurboJPEG
+    monkeypatch.setitem(sys.modules, "turbojpeg", module)
+    return module
+
+
+def frame(width=640, height=480):
+    return types.SimpleNamespace(shape=(height, width, 3))
+
+
+def test_turbo_encodes_into_one_reused_buffer(monkeypatch):
+    module = fake_turbojpeg(monkeypatch)
+    encoder = frame_encoders.TurboJpegEncoder(50, "420")
+
+    first = bytes(encoder.encode(frame()))
+    second = encoder.encode(frame())
+    assert first == bytes(second) == b"JPEG"
+    assert module.calls[0] is module.calls[1] is encoder._buffer
+    assert len(encoder._buffer) >= 640 * 480 * 6
+
+    # A larger frame grows the buffer
+    encoder.encode(frame(1280, 720))
+    assert module.calls[2] is not module.calls[0]
+
+
+def test_turbo_without_dst_allocates_per_frame(monkeypatch):
+    module = fake_turbojpeg(monkeypatch, with_dst=False)
+    encoder = frame_encoders.TurboJpegEncoder(50, "420")
+
+    assert encoder.encode(frame()) == b"JPEG"
+    assert encoder._buffer is None and module.calls == [None]
+
+
+def test_turbo_encode_errors_keep_the_dst_path(monkeypatch):
+    fake_turbojpeg(monkeypatch)
+    encoder = frame_encoders.TurboJpegEncoder(50, "420")
+
+    def bad_frame(*args, **kwargs):
+        raise TypeError("unsupported dtype")
+
+    monkeypatch.setattr(encoder._jpeg, "encode", bad_frame)
+    with pytest.raises(TypeError):
+        encoder.encode(frame())
+    assert encoder._supports_dst
+
+
+def test_presets_select_quality_and_subsampling(monkeypatch):
+    fake_turbojpeg(monkeypatch)
+    encoder = frame_encoders.create_encoder("turbo", "best")
+    assert (encoder.quality, encoder.subsampling) == (90, "444")
+
+
+@pytest.mark.parametrize("turbojpeg", [None, "missing library"])
+def test_auto_falls_back_to_opencv(monkeypatch, turbojpeg):
+    pytest.importorskip("cv2")
+    if turbojpeg is None:
+        monkeypatch.setitem(sys.modules, "turbojpeg", None)
+    else:
+        fake_turbojpeg(monkeypatch, fail=RuntimeError(turbojpeg))
+
+    encoder = frame_encoders.create_encoder("auto", "default")
+    assert isinstance(encoder, frame_encoders.OpenCVEncoder)
+    assert (encoder.quality, encoder.subsampling) == (50, "420")
+
+
+def test_opencv_encoder_produces_jpeg():
+    pytest.importorskip("cv2")
+    np = pytest.importorskip("numpy")
+
+    jpeg = frame_encoders.OpenCVEncoder(50, "420").encode(np.zeros((240, 320, 3), dtype=np.uint8))
+    assert bytes(jpeg[:2]) == b"\xff\xd8"
+
+
+def test_resizer_reuses_its_buffer():
+    pytest.importorskip("cv2")
+    np = pytest.importorskip("numpy")
+    resizer = frame_encoders.FrameResizer(320, 240)
+
+    first = resizer.resize(np.zeros((480, 640, 3), dtype=np.uint8))
+    second = resizer.resize(np.ones((480, 640, 3), dtype=np.uint8))
+    assert first is second and second.shape == (240, 320, 3)
+
+    # Channel count and dtype changes get a new buffer
+    gray = resizer.resize(np.zeros((480, 640), dtype=np.uint8))
+    assert gray is not second and gray.shape == (240, 320)
+    wide = resizer.resize(np.zeros((480, 640), dtype=np.float32))
+    assert wide is not gray and wide.dtype == np.float32
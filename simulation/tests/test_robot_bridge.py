@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+import robot_bridge
+
+SIMULATION_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_does_not_load_cv2():
+    # A fresh interpreter, since other tests may have imported cv2 already
+    code = "import sys, robot_bridge; assert 'cv2' not in sys.modules and 'numpy' not in sys.modules"
+    result = subprocess.run([sys.executable, "-c", code], cwd=SIMULATION_DIR, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_bridge_from_args_remote():
+    bridge = robot_bridge.bridge_from_args(robot_bridge.parse_args(
+        ["--ip", "10.0.0.5", "--port", "9000", "--id", "7", "--encoder", "turbo", "--quality", "high"]
+    ))
+    assert bridge.api_url == "http://10.0.0.5:9000"
+    assert bridge.robot_id == 7
+    assert (bridge.encoder_name, bridge.quality_preset) == ("turbo", "high")
+    # Built lazily on the first upload
+    assert bridge.encoder is None
+
+
+def test_bridge_from_args_local_defaults():
+    args = robot_bridge.parse_args(["--local", "--sim"])
+    bridge = robot_bridge.bridge_from_args(args)
+    assert args.sim
+    assert bridge.api_url == "http://127.0.0.1:8000"
+    assert bridge.topic == robot_bridge.DEFAULT_TOPIC
+    assert (bridge.encoder_name, bridge.quality_preset) == ("auto", "default")